@@ -0,0 +1,65 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import DateTime, delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Job, JobArchive, job_tags
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states that have not changed for the retention window are archived
+ARCHIVABLE_STATUSES = ("expired", "refunded", "draft")
+
+# Every archive column but archived_at is copied from the jobs column of the same name
+ARCHIVED_COLUMNS = [column.name for column in JobArchive.__table__.columns if column.name != "archived_at"]
+
+
+def archive_jobs(
+    db: Session,
+    now: Optional[datetime] = None,
+    retention_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Move expired, refunded and draft jobs untouched for `retention_days` to jobs_archive.
+
+    Each batch is copied and deleted in one transaction, so a job is always in
+    exactly one of the two tables. The job with the highest id is left alone:
+    SQLite hands a freed top id to the next insert, which would then clash with
+    the archived row. Returns the number of jobs archived.
+    """
+    now = now or datetime.now(timezone.utc)
+    retention_days = settings.archive_retention_days if retention_days is None else retention_days
+    batch_size = batch_size or settings.archive_batch_size
+    cutoff = now - timedelta(days=retention_days)
+    archivable = (
+        Job.status.in_(ARCHIVABLE_STATUSES),
+        Job.updated_at <= cutoff,
+        Job.id < select(func.max(Job.id)).scalar_subquery(),
+    )
+    archived = 0
+    while True:
+        ids = db.scalars(select(Job.id).where(*archivable).order_by(Job.id).limit(batch_size)).all()
+        if not ids:
+            break
+        # Re-check the criteria while copying, in case a job was edited since the lookup
+        copied = db.execute(
+            insert(JobArchive).from_select(
+                ARCHIVED_COLUMNS + ["archived_at"],
+                select(
+                    *(Job.__table__.c[name] for name in ARCHIVED_COLUMNS),
+                    literal(now, DateTime(timezone=True)),
+                ).where(Job.id.in_(ids), *archivable),
+            )
+        )
+        moved = select(JobArchive.id).where(JobArchive.id.in_(ids))
+        db.execute(job_tags.delete().where(job_tags.c.job_id.in_(moved)))
+        db.execute(delete(Job).where(Job.id.in_(moved)).execution_options(synchronize_session=False))
+        db.commit()
+        archived += copied.rowcount
+        if len(ids) < batch_size:
+            break
+    if archived:
+        logger.info("Archived %d jobs", archived, extra={"archived": archived})
+    return archived
@@ -1,3 +1,7 @@
+import hmac
+import logging
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import HTTPException, status, Request, Response
@@ -5,40 +9,125 @@ from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from passlib.context import CryptContext
 from itsdangerous import URLSafeTimedSerializer
 from app.config import settings
+from app.hashing import HashingPool, HashingPoolFull
+from app.metrics import auth_verification_seconds, password_hash_in_flight, password_hash_queue_depth, password_hash_rejected_total, timed
 
 security = HTTPBasic()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
+logger = logging.getLogger(__name__)
 serializer = URLSafeTimedSerializer(settings.secret_key)
 
+# Any of these cookies means the response may be personalised
+SESSION_COOKIES = ("admin_session", "employer_session")
+
+
+# bcrypt runs here rather than on the request threads
+hashing_pool = HashingPool(settings.password_hash_workers, settings.password_hash_max_queue, password_hash_queue_depth.set)
+
+
+def _run_hashing(fn, *args):
+    """Run a bcrypt call on the hashing pool, answering 503 when it is saturated"""
+    try:
+        with password_hash_in_flight.track_inprogress(), timed(auth_verification_seconds, "auth_seconds", "password"):
+            return hashing_pool.run(fn, *args)
+    except HashingPoolFull:
+        password_hash_rejected_total.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _run_hashing(pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _run_hashing(pwd_context.hash, password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if its hash was made with outdated cost parameters,
+    return a fresh hash to store in its place (otherwise None).
+    """
+    return _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+class AdminCredentials:
+    """
+    The admin username and password hash, hashed at most once per process.
+
+    Uses ADMIN_PASSWORD_HASH when configured; otherwise ADMIN_PASSWORD is hashed
+    at startup by prepare_admin_credentials, or on first use failing that, and
+    the plaintext is dropped. Every check costs a single bcrypt verification,
+    and the username is compared in constant time whether or not it matches, so
+    timing reveals neither.
+    """
+
+    def __init__(self, username: str, password: Optional[str] = None, password_hash: Optional[str] = None):
+        self.username = username
+        self._password = password
+        self._password_hash = password_hash
+        self._lock = threading.Lock()
+
+    @property
+    def password_hash(self) -> str:
+        if self._password_hash is None:
+            with self._lock:
+                if self._password_hash is None:
+                    self._password_hash = get_password_hash(self._password)
+                    self._password = None
+        return self._password_hash
+
+    def verify(self, username: str, password: str) -> bool:
+        is_correct_username = hmac.compare_digest(username.encode(), self.username.encode())
+        is_correct_password, new_hash = verify_and_update_password(password, self.password_hash)
+        if new_hash:
+            # Cost parameters changed: keep the stronger hash for this process
+            self._password_hash = new_hash
+            logger.warning("Admin password hash uses outdated cost parameters; update ADMIN_PASSWORD_HASH")
+        return is_correct_username and is_correct_password
+
+
+# Built once from settings; nothing else keeps a reference to the plaintext
+_admin_credentials: Optional[AdminCredentials] = None
+_admin_credentials_lock = threading.Lock()
+
+
+def admin_credentials() -> AdminCredentials:
+    """The credential store for the admin settings, built on first use"""
+    global _admin_credentials
+    if _admin_credentials is None:
+        with _admin_credentials_lock:
+            if _admin_credentials is None:
+                if settings.admin_password_hash:
+                    _admin_credentials = AdminCredentials(settings.admin_username, password_hash=settings.admin_password_hash)
+                else:
+                    _admin_credentials = AdminCredentials(settings.admin_username, password=settings.admin_password)
+    return _admin_credentials
+
+
+def reset_admin_credentials() -> None:
+    """Drop the credential store so the next check rebuilds it from settings"""
+    global _admin_credentials
+    with _admin_credentials_lock:
+        _admin_credentials = None
+
+
+def prepare_admin_credentials() -> None:
+    """Hash ADMIN_PASSWORD up front so the first admin login costs one bcrypt call"""
+    admin_credentials().password_hash
 
 
 def authenticate_admin(credentials: HTTPBasicCredentials) -> bool:
-    is_correct_username = credentials.username == settings.admin_username
-    is_correct_password = verify_password(credentials.password, get_password_hash(settings.admin_password))
-    return is_correct_username and is_correct_password
+    return admin_credentials().verify(credentials.username, credentials.password)
 
 
 def authenticate_admin_plain(username: str, password: str) -> bool:
-    """Authenticate admin with plain text credentials"""
-    print(f"DEBUG: authenticate_admin_plain called with username='{username}', password='{password}'")
-    print(f"DEBUG: settings.admin_username='{settings.admin_username}', settings.admin_password='{settings.admin_password}'")
-    
-    is_correct_username = username == settings.admin_username
-    # For now, compare plain text passwords (in production, use proper hashing)
-    is_correct_password = password == settings.admin_password
-    
-    print(f"DEBUG: is_correct_username={is_correct_username}, is_correct_password={is_correct_password}")
-    
-    result = is_correct_username and is_correct_password
-    print(f"DEBUG: Final result={result}")
-    return result
+    """Authenticate admin with credentials from the login form"""
+    return admin_credentials().verify(username, password)
 
 
 def create_admin_session(response: Response) -> None:
@@ -57,26 +146,21 @@ def create_admin_session(response: Response) -> None:
 def verify_admin_session(request: Request) -> bool:
     """Verify admin session from cookie"""
     session_token = request.cookies.get("admin_session")
-    print(f"DEBUG: verify_admin_session - session_token: {session_token}")
-    
     if not session_token:
-        print("DEBUG: verify_admin_session - no session token found")
+        logger.debug("verify_admin_session: no session cookie")
         return False
     
     try:
         serializer.loads(session_token, max_age=3600)
-        print("DEBUG: verify_admin_session - session token valid")
         return True
     except Exception as e:
-        print(f"DEBUG: verify_admin_session - session token invalid: {e}")
+        logger.debug("verify_admin_session: invalid session cookie (%s)", type(e).__name__)
         return False
 
 
 def clear_admin_session(response: Response) -> None:
     """Clear admin session"""
-    print("DEBUG: clear_admin_session called")
     response.delete_cookie("admin_session")
-    print("DEBUG: admin_session cookie deleted")
 
 
 # Employer Authentication Functions
@@ -97,26 +181,18 @@ def create_employer_session(response: Response, employer_account_id: int) -> Non
 def verify_employer_session(request: Request) -> Optional[int]:
     """Verify employer session from cookie, returns employer_account_id if valid"""
     session_token = request.cookies.get("employer_session")
-    print(f"DEBUG: verify_employer_session - session_token: {session_token}")
-    
     if not session_token:
-        print("DEBUG: verify_employer_session - no session token found")
+        logger.debug("verify_employer_session: no session cookie")
         return None
     
     try:
         session_data = serializer.loads(session_token, max_age=3600)
-        print(f"DEBUG: verify_employer_session - session_data: {session_data}")
         if session_data.get("type") == "employer":
-            employer_id = session_data.get("employer_account_id")
-            print(f"DEBUG: verify_employer_session - returning employer_id: {employer_id}")
-            return employer_id
-        else:
-            print("DEBUG: verify_employer_session - session type is not 'employer'")
+            return session_data.get("employer_account_id")
+        logger.debug("verify_employer_session: session type is not 'employer'")
     except Exception as e:
-        print(f"DEBUG: verify_employer_session - exception: {e}")
-        pass
+        logger.debug("verify_employer_session: invalid session cookie (%s)", type(e).__name__)
     
-    print("DEBUG: verify_employer_session - returning None")
     return None
 
 
@@ -125,17 +201,117 @@ def clear_employer_session(response: Response) -> None:
     response.delete_cookie("employer_session")
 
 
+@dataclass(frozen=True)
+class Principal:
+    """Who is making the request, decoded from the session cookies"""
+
+    is_admin: bool = False
+    employer_account_id: Optional[int] = None
+
+    @property
+    def is_employer(self) -> bool:
+        return self.employer_account_id is not None
+
+
+ANONYMOUS = Principal()
+
+
+def get_principal(request: Request) -> Principal:
+    """
+    Request dependency returning the current Principal.
+
+    Each session cookie is verified at most once per request; the result is
+    kept on request.state for the middleware, templates and handlers to share.
+    Requests without session cookies skip verification entirely.
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        if not any(name in request.cookies for name in SESSION_COOKIES):
+            principal = ANONYMOUS
+        else:
+            with timed(auth_verification_seconds, "auth_seconds", "session"):
+                principal = Principal(
+                    is_admin=verify_admin_session(request),
+                    employer_account_id=verify_employer_session(request),
+                )
+        request.state.principal = principal
+    return principal
+
+
+# Double-submit CSRF cookie: holds the signed token reused for the whole session
+CSRF_COOKIE = "csrf_token"
+
+
 def generate_csrf_token() -> str:
     import secrets
     return serializer.dumps(f"csrf_token_{secrets.token_hex(16)}")
 
 
-def verify_csrf_token(token: str, max_age: int = 3600) -> bool:
+def _csrf_payload(token: Optional[str], max_age: int) -> Optional[str]:
+    """The random value inside a signed CSRF token, or None if it is invalid or expired"""
+    if not token:
+        return None
     try:
-        serializer.loads(token, max_age=max_age)
-        return True
-    except:
+        return str(serializer.loads(token, max_age=max_age))
+    except Exception:
+        return None
+
+
+def verify_csrf_token(token: str, max_age: int = 3600) -> bool:
+    return _csrf_payload(token, max_age) is not None
+
+
+def verify_csrf_request(request: Request, token: Optional[str]) -> bool:
+    """
+    Double-submit check: the submitted token must carry the same value as the
+    visitor's CSRF cookie, and both must have valid, unexpired signatures.
+    """
+    with timed(auth_verification_seconds, "auth_seconds", "csrf"):
+        submitted = _csrf_payload(token, settings.csrf_token_max_age)
+        expected = _csrf_payload(request.cookies.get(CSRF_COOKIE), settings.csrf_token_max_age)
+    if submitted is None or expected is None:
         return False
+    return hmac.compare_digest(submitted, expected)
+
+
+class LazyCsrfToken:
+    """
+    CSRF token for one request, produced only when a template renders it.
+
+    Reuses the token in the visitor's CSRF cookie while it is valid and only
+    signs a new one when there is none; `is_new` tells the middleware to set it.
+    Requests that never render a form (feeds, sitemaps, webhooks) do no work.
+    """
+
+    def __init__(self, cookie_token: Optional[str]):
+        self._cookie_token = cookie_token
+        self._value: Optional[str] = None
+        self.is_new = False
+
+    @property
+    def value(self) -> str:
+        if self._value is None:
+            if _csrf_payload(self._cookie_token, settings.csrf_token_max_age) is not None:
+                self._value = self._cookie_token
+            else:
+                self._value = generate_csrf_token()
+                self.is_new = True
+        return self._value
+
+    def __str__(self) -> str:
+        return self.value
+
+
+def set_csrf_cookie(response: Response, token: str) -> None:
+    """Store the session's CSRF token for double-submit verification"""
+    response.set_cookie(
+        key=CSRF_COOKIE,
+        value=token,
+        max_age=settings.csrf_token_max_age,
+        httponly=True,
+        secure=False,  # Set to True in production with HTTPS
+        samesite="lax"
+    )
 
 
 def get_csrf_token_from_request(request: Request) -> Optional[str]:
@@ -158,7 +334,7 @@ def require_csrf_token(request: Request):
     """Middleware to require CSRF token on POST requests"""
     if request.method == "POST":
         token = get_csrf_token_from_request(request)
-        if not token or not verify_csrf_token(token):
+        if not verify_csrf_request(request, token):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Invalid CSRF token"
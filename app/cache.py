@@ -0,0 +1,389 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+from sqlalchemy import event
+from starlette.datastructures import Headers
+from sqlalchemy.orm import Session
+from app.auth import SESSION_COOKIES
+from app.conditional import Validators, is_not_modified, not_modified_headers
+from app.config import settings
+from app.models import Job, Employer, Category
+
+# Public pages that render the same for every anonymous visitor
+CACHEABLE_PATHS = re.compile(r"^(/|/jobs/feed\.json|/sitemap\.xml|/jobs/\d+)$")
+
+# Query parameters whose responses are per-client and never worth storing
+UNCACHEABLE_PARAMS = frozenset({"since"})
+
+# Query parameters the cached pages read. Anything else (tracking tags, cache
+# busters) renders the same page, so it is dropped from the key instead of
+# filling the cache with copies. None of the cached pages reads one today.
+KEY_PARAMS: frozenset[str] = frozenset()
+
+
+class CachedResponse:
+    """Status, headers and body of a stored response"""
+
+    __slots__ = ("status", "headers", "body", "stored_at")
+
+    def __init__(self, status: int, headers: list, body: bytes, stored_at: Optional[float] = None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at if stored_at is not None else time.time()
+
+    def validators(self) -> Validators:
+        """ETag and Last-Modified the handler attached to the stored response"""
+        return Validators.from_headers(Headers(raw=self.headers))
+
+    @property
+    def size(self) -> int:
+        """Bytes of body and headers held by this entry"""
+        return len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache bounded by stored bytes; the jobs version is local to the worker"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._size = 0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        """Bytes currently stored"""
+        return self._size
+
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._size = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._discard(key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+class DiskCacheBackend:
+    """
+    On-disk cache shared by every worker on the host.
+
+    The jobs version lives in a VERSION file and entries are stored under a
+    directory per version, so bumping the version invalidates every worker at
+    once and older directories can simply be removed. Other workers may still
+    be writing into the directory just retired, so it is kept until the next
+    bump, and any file system error is treated as a cache miss. The current
+    version's files are kept under max_bytes by removing the oldest first;
+    workers do not coordinate, so the bound is approximate.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._version_path = os.path.join(directory, "VERSION")
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        try:
+            with open(self._version_path) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump_version(self) -> None:
+        with self._lock:
+            version = self.version() + 1
+            self._write_atomic(self._version_path, str(version).encode())
+            keep = {f"v{version}", f"v{version - 1}"}
+            for name in os.listdir(self.directory):
+                if name.startswith("v") and name not in keep:
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"v{self.version()}", key)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            with open(self._path(key), "rb") as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in meta["headers"]]
+        return CachedResponse(meta["status"], headers, body, meta["stored_at"])
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        meta = {
+            "status": entry.status,
+            "headers": [(name.decode("latin-1"), value.decode("latin-1")) for name, value in entry.headers],
+            "stored_at": entry.stored_at,
+        }
+        data = json.dumps(meta).encode() + b"\n" + entry.body
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                self._make_room(os.path.dirname(path), len(data))
+            self._write_atomic(path, data)
+        except OSError:
+            # e.g. a version bump removed the directory mid-write: just don't cache
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.startswith("v"):
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _make_room(self, directory: str, needed: int) -> None:
+        files = []
+        for item in os.scandir(directory):
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, item.path))
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files):
+            if size + needed <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def create_backend():
+    """Build the backend selected by RESPONSE_CACHE_BACKEND, or None when disabled"""
+    if settings.response_cache_backend == "memory":
+        return MemoryCacheBackend(settings.response_cache_max_bytes)
+    if settings.response_cache_backend == "disk":
+        return DiskCacheBackend(settings.response_cache_dir, settings.response_cache_max_bytes)
+    return None
+
+
+backend = create_backend()
+
+
+def invalidate() -> None:
+    """Bump the jobs version so every cached page is rebuilt on next request"""
+    if backend is not None:
+        backend.bump_version()
+
+
+def clear() -> None:
+    """Drop all cached responses"""
+    if backend is not None:
+        backend.clear()
+
+
+def entry_ttl() -> int:
+    """
+    Seconds a stored response is served.
+
+    Memory backends are per worker, and only the worker that runs the expiry
+    sweep sees its commit, so the others keep showing an expired job until
+    their entries age out. Their TTL is capped so that sweep interval plus TTL
+    stays within EXPIRED_JOB_MAX_LISTED_SECONDS.
+    """
+    if isinstance(backend, MemoryCacheBackend):
+        budget = settings.expired_job_max_listed_seconds - settings.expiry_sweep_interval_seconds
+        return max(0, min(settings.response_cache_ttl, budget))
+    return settings.response_cache_ttl
+
+
+def cache_key(scope: dict, version: int) -> str:
+    """
+    Key a request on path, the query parameters the page reads and jobs version.
+
+    The Host header is client-controlled, so it is left out: keying on it would
+    let anyone fill the cache with copies of the same page. Cached pages build
+    absolute URLs from settings.site_url instead.
+    """
+    query = parse_qsl(scope["query_string"].decode("latin-1"))
+    normalized = urlencode(sorted((name, value) for name, value in query if name in KEY_PARAMS))
+    raw = f"{version}|{scope['path']}?{normalized}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def is_cacheable(scope: dict) -> bool:
+    """Only anonymous GETs of the public read-only pages are cached"""
+    if scope["type"] != "http" or scope["method"] != "GET":
+        return False
+    if not CACHEABLE_PATHS.match(scope["path"]):
+        return False
+    query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+    if any(name in UNCACHEABLE_PARAMS for name, _ in query):
+        return False
+    cookie_header = dict(scope["headers"]).get(b"cookie", b"").decode("latin-1")
+    return not any(f"{name}=" in cookie_header for name in SESSION_COOKIES)
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve anonymous public pages from the response cache.
+
+    Runs outside the other middleware, so a hit skips session verification,
+    CSRF token generation, the database and template rendering entirely.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if backend is None or not is_cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope, backend.version())
+        entry = backend.get(key)
+        if entry is not None and time.time() - entry.stored_at > entry_ttl():
+            backend.delete(key)
+            entry = None
+
+        if entry is not None and is_not_modified(Headers(scope=scope), entry.validators()):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": not_modified_headers(entry.validators()) + [(b"x-cache", b"HIT")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if entry is not None:
+            await send({
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": [(name, value) for name, value in entry.headers] + [(b"x-cache", b"HIT")],
+            })
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        start = {}
+        body = []
+        size = 0
+
+        async def capture(message):
+            nonlocal body, size
+            if message["type"] == "http.response.start":
+                start.update(message)
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body" and body is not None:
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > settings.response_cache_max_body_bytes:
+                    # Too big to keep: stream the rest straight through
+                    body = None
+                else:
+                    body.append(chunk)
+                    if not message.get("more_body", False):
+                        self._store(key, start, b"".join(body))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    @staticmethod
+    def _store(key: str, start: dict, body: bytes) -> None:
+        headers = list(start.get("headers", []))
+        if start.get("status") != 200 or any(name.lower() == b"set-cookie" for name, _ in headers):
+            return
+        backend.set(key, CachedResponse(200, headers, body))
+
+
+# Invalidate on every committed change to jobs or the employers and categories
+# shown on job pages. Covers admin and employer edits, publishing, expiry and
+# the Stripe webhook without each handler having to remember to do it.
+INVALIDATING_MODELS = (Job, Employer, Category)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_pages_stale(session, flush_context) -> None:
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, INVALIDATING_MODELS) for obj in changed):
+        session.info["response_cache_stale"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_pages_stale_on_bulk_write(orm_execute_state) -> None:
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.class_ in INVALIDATING_MODELS:
+            orm_execute_state.session.info["response_cache_stale"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session) -> None:
+    if session.info.pop("response_cache_stale", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_mark(session) -> None:
+    session.info.pop("response_cache_stale", None)
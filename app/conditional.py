@@ -0,0 +1,151 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Mapping, Optional
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.auth import SESSION_COOKIES
+from app.config import settings
+from app.models import Job, JobListing, Category
+from app.queries import active_jobs_criteria
+
+
+@dataclass
+class Validators:
+    """Strong ETag and Last-Modified value describing one representation"""
+
+    etag: Optional[str]
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def from_headers(cls, headers: Mapping[str, str]) -> "Validators":
+        """Read validators back from the headers of a stored response"""
+        last_modified = headers.get("last-modified")
+        try:
+            last_modified = _as_utc(parsedate_to_datetime(last_modified)) if last_modified else None
+        except (TypeError, ValueError):
+            last_modified = None
+        return cls(etag=headers.get("etag"), last_modified=last_modified)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["ETag"] = self.etag
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize to an aware UTC datetime truncated to HTTP-date precision"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes; they are stored as UTC
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def make_validators(*parts, last_modified: Optional[datetime] = None) -> Validators:
+    """Build validators from the values a representation is derived from"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return Validators(etag=f'"{digest}"', last_modified=_as_utc(last_modified))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against our ETag (RFC 9110 13.1.2)"""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def is_not_modified(request_headers: Mapping[str, str], validators: Validators) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when the
+    client sent no entity tags.
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        return validators.etag is not None and etag_matches(if_none_match, validators.etag)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return validators.last_modified <= _as_utc(since)
+    return False
+
+
+def not_modified_response(validators: Validators) -> Response:
+    """Empty 304 carrying the validators the client should keep"""
+    return Response(status_code=304, headers=validators.headers)
+
+
+def not_modified_headers(validators: Validators) -> list[tuple[bytes, bytes]]:
+    """Raw ASGI headers for a 304 sent outside the route handlers"""
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in validators.headers.items()]
+
+
+def has_session_cookie(request: Request) -> bool:
+    """Pages rendered for a signed-in user vary per session and get no validators"""
+    return any(name in request.cookies for name in SESSION_COOKIES)
+
+
+def active_jobs_validators(db: Session, representation: str, now: Optional[datetime] = None) -> Validators:
+    """
+    Validators for listings built from the published jobs.
+
+    Runs on every anonymous poll, 304s included, so each value is read with one
+    index seek rather than by aggregating the published rows. The newest
+    jobs.updated_at moves on any edit and on every status change (publishing,
+    withdrawal, the expiry sweep); employer and category renames move
+    job_listings.updated_at. The feed's can_refund flag flips with time alone,
+    so the newest published_at already outside the refund window is part of
+    the ETag too. The category menu lists empty categories as well, and that
+    small table's count, newest id and updated_at cover it.
+    """
+    now = now or datetime.now(timezone.utc)
+    refund_cutoff = now - timedelta(hours=settings.refund_window_hours)
+    row = db.execute(
+        select(
+            select(func.max(Job.updated_at)).scalar_subquery(),
+            select(func.max(JobListing.updated_at)).scalar_subquery(),
+            select(func.max(Job.published_at))
+            .where(*active_jobs_criteria(), Job.published_at < refund_cutoff)
+            .scalar_subquery(),
+            select(func.count(Category.id)).scalar_subquery(),
+            select(func.max(Category.id)).scalar_subquery(),
+            select(func.max(Category.updated_at)).scalar_subquery(),
+        )
+    ).one()
+    last_updated, last_listed, last_unrefundable, categories, newest_category, categories_updated = row
+
+    last_modified = max(
+        (_as_utc(value) for value in (last_updated, last_listed, categories_updated) if value is not None),
+        default=None,
+    )
+    return make_validators(
+        representation, last_updated, last_listed, last_unrefundable, categories, newest_category, categories_updated,
+        last_modified=last_modified,
+    )
+
+
+def job_validators(job: Job) -> Validators:
+    """Validators for a single job page, which also shows its employer and category"""
+    employer_updated = job.employer.updated_at if job.employer else None
+    category_updated = job.category.updated_at if job.category else None
+    last_modified = max(
+        (_as_utc(value) for value in (job.updated_at or job.created_at, employer_updated, category_updated) if value is not None),
+        default=None,
+    )
+    return make_validators(
+        "job", job.id, job.status, job.updated_at, job.employer_id, employer_updated, job.category_id, category_updated,
+        last_modified=last_modified,
+    )
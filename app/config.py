@@ -6,9 +6,25 @@ class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./job_board.db"
     
+    database_read_url: Optional[str] = None  # Replica serving GET and HEAD requests, e.g. a Postgres standby
+    sqlite_read_only_pool: bool = False  # Without DATABASE_READ_URL, serve reads from a second mode=ro pool on the SQLite file
+    read_your_writes_seconds: int = 10  # After a write, that browser's reads stay on the primary this long
+    db_pool_size: int = 20  # Pooled connections; covers the threadpool that runs the handlers
+    db_max_overflow: int = 20  # Extra connections opened under bursts, closed when returned
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection before erroring
+    
+    # SQLite production profile, applied on every new connection
+    sqlite_wal: bool = True  # WAL journal: readers are not blocked while a write commits
+    sqlite_synchronous: str = "NORMAL"  # Safe with WAL; FULL fsyncs on every commit
+    sqlite_busy_timeout_ms: int = 5000  # Wait for the write lock instead of "database is locked"
+    sqlite_mmap_size: int = 268435456  # Bytes of the file read through mmap (256 MiB)
+    sqlite_cache_size: int = -16384  # Page cache per connection; negative is KiB (16 MiB)
+    
     # Admin Authentication
     admin_username: str = "admin"
     admin_password: str = "changeme"
+    admin_password_hash: Optional[str] = None  # bcrypt hash; takes precedence over ADMIN_PASSWORD
+    bcrypt_rounds: int = 12  # Cost factor; hashes made with another cost are upgraded on next login
     secret_key: str = "your-secret-key-change-in-production"
     
     # Stripe Configuration
@@ -21,6 +37,26 @@ class Settings(BaseSettings):
     job_post_price: int = 1000  # $10.00 in cents
     salary_range_required: bool = True
     job_expiry_days: int = 30
+    jobs_page_size: int = 20  # Jobs per page on the home page and search results
+    markdown_cache_size: int = 1024  # Rendered documents kept in the Markdown LRU cache
+    site_url: str = "https://yourdomain.com"  # Public base URL used in sitemaps
+    sitemap_shard_size: int = 50000  # Job ids per sitemap shard; Google caps a sitemap at 50,000 URLs
+    
+    # Response cache for anonymous public pages
+    response_cache_backend: str = "memory"  # memory, disk or none
+    response_cache_dir: str = "./.cache/responses"  # Used by the disk backend
+    response_cache_ttl: int = 60  # Seconds; bounds staleness across workers and for time-based expiry
+    response_cache_max_bytes: int = 67108864  # 64 MiB of bodies and headers per worker, or shared by all workers on disk
+    response_cache_max_body_bytes: int = 1048576  # Larger responses are streamed through uncached
+    
+    # Background tasks
+    scheduler_enabled: bool = True  # Run periodic tasks in every worker; a lease row picks one worker per run
+    expiry_sweep_interval_seconds: int = 30  # Published jobs past expires_at are marked expired within this long
+    expired_job_max_listed_seconds: int = 60  # Longest an expired job stays on cached pages in any worker; caps the memory cache TTL
+    expiry_sweep_batch_size: int = 500  # Jobs expired per transaction
+    archive_interval_seconds: int = 3600  # How often old jobs are moved to jobs_archive
+    archive_retention_days: int = 30  # Expired, refunded and draft jobs unchanged this long are archived
+    archive_batch_size: int = 500  # Jobs archived per transaction
     
     # Employer Settings
     refund_window_hours: int = 4  # Hours after posting to allow refunds
@@ -28,8 +64,27 @@ class Settings(BaseSettings):
     job_editing_enabled: bool = True
     max_jobs_per_employer: Optional[int] = None  # None = unlimited
     
+    # Password hashing pool
+    password_hash_workers: int = 2  # Threads running bcrypt
+    password_hash_max_queue: int = 16  # Calls allowed to wait for a worker before answering 503
+    
+    # Logging
+    log_level: str = "INFO"  # Root level; DEBUG turns on the request tracing
+    log_levels: dict[str, str] = {}  # Per-logger overrides, e.g. {"app.auth": "DEBUG"}
+    log_sampling: dict[str, float] = {}  # Fraction of below-WARNING records kept per logger, e.g. {"app.main": 0.1}
+    log_json: bool = True  # One JSON object per line; False for plain text while developing
+    
+    # Metrics
+    server_timing: str = "admin"  # Server-Timing response header: off, admin (admin sessions only) or all
+    metrics_token: Optional[str] = None  # Bearer token for Prometheus scrapes of /metrics; admins can always view it
+    
+    # Query diagnostics
+    slow_query_threshold_ms: int = 200  # Statements at least this slow are logged with their plan; 0 disables
+    query_stats_top_n: int = 25  # Fingerprints listed on /admin/diagnostics
+    
     # Security
     csrf_secret: str = "csrf-secret-key-change-in-production"
+    csrf_token_max_age: int = 86400  # Seconds a session's CSRF token (and its cookie) stays valid
     
     class Config:
         env_file = ".env"
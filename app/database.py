@@ -1,21 +1,168 @@
-from sqlalchemy import create_engine
+import os
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.config import settings
+from app.query_stats import instrument_engine
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def sqlite_pragmas() -> dict[str, object]:
+    """
+    The production profile for SQLite, applied to every new connection.
+
+    WAL lets readers carry on while a writer commits, and synchronous=NORMAL is
+    safe in WAL mode (a power cut can lose the last commits, never corrupt the
+    file). busy_timeout makes a second writer wait for the lock instead of
+    failing with "database is locked".
+    """
+    return {
+        "journal_mode": "WAL" if settings.sqlite_wal else "DELETE",
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "temp_store": "MEMORY",
+    }
+
+
+def build_engine(url: str, pragmas: Optional[dict[str, object]] = None) -> Engine:
+    """
+    Create an engine with the configured pool and, for SQLite files, pragmas.
+
+    Args:
+        url: Database URL
+        pragmas: SQLite pragmas to set on connect; defaults to sqlite_pragmas()
+    """
+    database_url = make_url(url)
+    is_sqlite = database_url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and database_url.database in (None, "", ":memory:")
+    options = {}
+    if not in_memory:
+        # Enough connections for every threadpool worker running a handler
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+        )
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_pre_ping"] = True
+    engine = create_engine(url, **options)
+
+    if is_sqlite and not in_memory:
+        pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name} = {value}")
+            finally:
+                cursor.close()
+
+    instrument_engine(engine)
+    return engine
+
+
+def read_engine_url() -> Optional[str]:
+    """
+    URL of the engine serving reads: DATABASE_READ_URL when set, else (with
+    SQLITE_READ_ONLY_POOL) the primary SQLite file reopened with mode=ro.
+    None means reads go to the primary.
+    """
+    if settings.database_read_url:
+        return settings.database_read_url
+    url = make_url(settings.database_url)
+    if settings.sqlite_read_only_pool and url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        return f"sqlite:///file:{os.path.abspath(url.database)}?mode=ro&uri=true"
+    return None
+
+
+class RoutingSession(Session):
+    """
+    Session that can send its reads to a replica engine.
+
+    With `use_replica` set, SELECTs run on `replica`; flushes and UPDATE,
+    INSERT and DELETE statements always go to the primary the session is bound to.
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, use_replica: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+        self.use_replica = use_replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.use_replica
+            and self.replica is not None
+            and not self._flushing
+            and not getattr(clause, "is_dml", False)
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+engine = build_engine(settings.database_url)
+
+# Only journal_mode needs write access; the primary has already set it
+_read_url = read_engine_url()
+read_engine = build_engine(_read_url, pragmas={
+    name: value for name, value in sqlite_pragmas().items() if name != "journal_mode"
+}) if _read_url else None
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replica=read_engine)
 
 Base = declarative_base()
 
+# Methods whose handlers only read, and can be served from the replica
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set after a request writes, so the same browser reads its own writes from
+# the primary until the replica has caught up
+READ_PRIMARY_COOKIE = "read_primary"
 
-def get_db():
-    db = SessionLocal()
+
+def get_db(request: Request = None):
+    """
+    Request dependency yielding a session.
+
+    Reads for GET and HEAD requests go to the read engine, unless the visitor
+    wrote something in the last READ_YOUR_WRITES_SECONDS. Any flush marks the
+    request, so the middleware can set the read-primary cookie.
+    """
+    use_replica = (
+        request is not None
+        and request.method in READ_METHODS
+        and READ_PRIMARY_COOKIE not in request.cookies
+    )
+    db = SessionLocal(use_replica=use_replica)
+    if request is not None:
+        db.info["request_state"] = request.state
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_request_wrote(session, flush_context):
+    state = session.info.get("request_state")
+    if state is not None:
+        state.wrote_primary = True
+
+
+def stick_to_primary(request: Request, response: Response) -> None:
+    """After a write, send this browser's reads to the primary for a while"""
+    if read_engine is not None and getattr(request.state, "wrote_primary", False):
+        response.set_cookie(
+            key=READ_PRIMARY_COOKIE,
+            value="1",
+            max_age=settings.read_your_writes_seconds,
+            httponly=True,
+            samesite="lax",
+        )
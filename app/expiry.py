@@ -0,0 +1,43 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import literal_column, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def expire_jobs(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Move published jobs whose expiry has passed to status 'expired'.
+
+    Works in batches of `batch_size`, committing each, so no single write holds
+    the database lock for long. The lookup is served by the partial index on
+    published jobs. Returns the number of jobs expired.
+    """
+    now = now or datetime.now(timezone.utc)
+    batch_size = batch_size or settings.expiry_sweep_batch_size
+    expired = 0
+    while True:
+        ids = db.scalars(
+            select(Job.id)
+            .where(Job.status == literal_column("'published'"), Job.expires_at <= now)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        db.execute(
+            update(Job)
+            .where(Job.id.in_(ids), Job.status == "published")
+            .values(status="expired", updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        expired += len(ids)
+        if len(ids) < batch_size:
+            break
+    if expired:
+        logger.info("Expired %d jobs", expired, extra={"expired": expired})
+    return expired
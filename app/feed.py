@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.models import Job
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.queries import active_jobs_query, job_listing_query
+
+# Rows fetched per round trip from the server-side cursor; also the number of
+# serialized jobs written per chunk of the response
+FEED_BATCH_SIZE = 500
+
+# The next `since` cursor starts this far before the poll, so a change committed
+# while a feed was being read is picked up again rather than missed. Consumers
+# upsert by id, so the repeated entries are harmless.
+SINCE_OVERLAP = timedelta(seconds=30)
+
+FEED_MEDIA_TYPE = "application/json"
+
+
+def parse_since(value: str) -> datetime:
+    """
+    Accept either an ISO 8601 timestamp or a `next_since` cursor from a previous poll.
+
+    Raises:
+        InvalidCursor: If the value is neither
+    """
+    try:
+        since = datetime.fromisoformat(value)
+    except ValueError:
+        position = decode_cursor(value)
+        try:
+            since = datetime.fromisoformat(position["since"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidCursor(str(e)) from e
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since
+
+
+def encode_since(since: datetime) -> str:
+    """Opaque cursor handed back to the consumer for its next poll"""
+    return encode_cursor({"since": since.isoformat()})
+
+
+def tombstone(job: Job) -> dict:
+    """Entry telling a consumer to drop a job that left the feed"""
+    status = job.status
+    if status == "published" and job.is_expired:
+        status = "expired"
+    return {
+        "id": job.id,
+        "deleted": True,
+        "status": status,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+def _stream_rows(query, serialize) -> Iterator[str]:
+    """Serialize query rows as comma-separated JSON, one chunk per batch"""
+    chunk = []
+    first = True
+    for job in query.yield_per(FEED_BATCH_SIZE):
+        chunk.append(("" if first else ",") + json.dumps(serialize(job)))
+        first = False
+        if len(chunk) >= FEED_BATCH_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_feed(engine: Engine) -> Iterator[str]:
+    """
+    Stream every active job as a JSON array, newest first.
+
+    Runs in its own session so it can outlive the request's dependencies, and
+    reads through a server-side cursor in batches, so memory stays flat however
+    many jobs the feed holds.
+    """
+    with Session(bind=engine) as db:
+        query = active_jobs_query(db).order_by(Job.published_at.desc(), Job.id.desc())
+        yield "["
+        yield from _stream_rows(query, Job.to_dict)
+        yield "]"
+
+
+def iter_feed_changes(engine: Engine, since: datetime, now: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Stream jobs changed since `since` as {"jobs": [...], "next_since": cursor}.
+
+    A job is included when it was edited after `since` or expired in between.
+    Active jobs are sent in full; jobs that were published once but are now
+    expired, refunded or withdrawn are sent as tombstones.
+    """
+    now = now or datetime.now(timezone.utc)
+    with Session(bind=engine) as db:
+        query = job_listing_query(db).filter(
+            Job.published_at.isnot(None),
+            or_(
+                Job.updated_at > since,
+                and_(Job.expires_at > since, Job.expires_at <= now),
+            ),
+        ).order_by(Job.updated_at, Job.id)
+
+        def serialize(job: Job) -> dict:
+            if job.status == "published" and not job.is_expired:
+                return job.to_dict()
+            return tombstone(job)
+
+        yield '{"jobs":['
+        yield from _stream_rows(query, serialize)
+        yield f'],"next_since":{json.dumps(encode_since(now - SINCE_OVERLAP))}}}'
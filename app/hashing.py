@@ -0,0 +1,71 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class HashingPoolFull(RuntimeError):
+    """Raised when every hashing worker is busy and the wait queue is full"""
+
+
+class HashingPool:
+    """
+    Dedicated, size-limited pool for password hashing and verification.
+
+    bcrypt releases the GIL while it works, so a few threads are enough to use
+    several cores without a process pool. Keeping it apart from the request
+    threadpool means a login burst can occupy at most `workers + max_queue`
+    request threads; anything beyond that is rejected immediately instead of
+    slowing every other route down.
+
+    `on_queue_depth`, if given, is called with the new queue depth whenever it
+    changes, under the pool's lock so that updates arrive in order.
+    """
+
+    def __init__(self, workers: int, max_queue: int, on_queue_depth: Optional[Callable[[int], Any]] = None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._on_queue_depth = on_queue_depth
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return max(0, self._in_flight - self.workers)
+
+    def _set_in_flight(self, in_flight: int) -> None:
+        # Caller holds self._lock
+        self._in_flight = in_flight
+        if self._on_queue_depth is not None:
+            self._on_queue_depth(self.queue_depth)
+
+    def run(self, fn: Callable[..., Any], *args) -> Any:
+        """
+        Run `fn(*args)` on the pool and wait for its result.
+
+        Raises:
+            HashingPoolFull: If the pool is at capacity
+        """
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashingPoolFull("password hashing queue is full")
+            self._set_in_flight(self._in_flight + 1)
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._set_in_flight(self._in_flight - 1)
+
+    def stats(self) -> dict[str, int]:
+        """Current load, for metrics and diagnostics"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": self.queue_depth,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Iterable, Optional
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.orm import Session, attributes
+from app.models import Job, JobListing, Employer, Category
+from app.queries import active_jobs_criteria
+from app.utils import markdown_excerpt, render_markdown
+
+# Jobs rebuilt per statement, keeping IN lists well inside SQLite's variable limit
+REFRESH_BATCH_SIZE = 500
+
+
+def format_salary(salary_min: Optional[int], salary_max: Optional[int], currency: Optional[str]) -> Optional[str]:
+    """Salary range as job cards show it, or None unless both ends are set"""
+    if not salary_min or not salary_max:
+        return None
+    return f"${salary_min:,} - ${salary_max:,} {currency or ''}".rstrip()
+
+
+def format_published_date(published_at: datetime) -> str:
+    return published_at.strftime("%b %d, %Y")
+
+
+def _listing_source():
+    """Everything a listing row is built from, for active jobs"""
+    return (
+        select(
+            Job.id, Job.title, Job.employer_id, Employer.name.label("employer_name"),
+            Job.category_id, Category.slug.label("category_slug"), Category.name.label("category_name"),
+            Job.tags, Job.excerpt_html, Job.description, Job.salary_min, Job.salary_max, Job.salary_currency,
+            Job.published_at, Job.updated_at,
+        )
+        .join(Employer, Employer.id == Job.employer_id)
+        .outerjoin(Category, Category.id == Job.category_id)
+        .where(*active_jobs_criteria(), Job.published_at.isnot(None))
+    )
+
+
+def _listing_values(row: Row) -> dict:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "employer_id": row.employer_id,
+        "employer_name": row.employer_name,
+        "category_id": row.category_id,
+        "category_slug": row.category_slug,
+        "category_name": row.category_name,
+        "tags": row.tags,
+        # Jobs saved before excerpts were stored are rendered once, here
+        "excerpt_html": row.excerpt_html or str(render_markdown(markdown_excerpt(row.description))),
+        "salary": format_salary(row.salary_min, row.salary_max, row.salary_currency),
+        "published_at": row.published_at,
+        "published_date": format_published_date(row.published_at),
+        "updated_at": row.updated_at,
+    }
+
+
+def refresh_job_listings(connection: Connection, job_ids: Iterable[int]) -> None:
+    """
+    Rebuild the job_listings rows of `job_ids` from the jobs table.
+
+    Each row is deleted and re-inserted if the job is still active, so one call
+    covers publishing, edits, expiry, refunds and deletion. Runs on the caller's
+    connection, inside its transaction.
+    """
+    job_ids = list(job_ids)
+    for start in range(0, len(job_ids), REFRESH_BATCH_SIZE):
+        batch = job_ids[start:start + REFRESH_BATCH_SIZE]
+        connection.execute(delete(JobListing).where(JobListing.id.in_(batch)))
+        values = [_listing_values(row) for row in connection.execute(_listing_source().where(Job.id.in_(batch)))]
+        if values:
+            connection.execute(insert(JobListing), values)
+
+
+def rebuild_job_listings(connection: Connection) -> int:
+    """Replace every job_listings row; returns the number of active jobs listed"""
+    connection.execute(delete(JobListing))
+    listed = 0
+    rows = connection.execute(_listing_source().order_by(Job.id).execution_options(yield_per=REFRESH_BATCH_SIZE))
+    for batch in rows.partitions():
+        connection.execute(insert(JobListing), [_listing_values(row) for row in batch])
+        listed += len(batch)
+    return listed
+
+
+def _changed(obj, *names: str) -> bool:
+    return any(attributes.get_history(obj, name).has_changes() for name in names)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def sync_job_listings_on_bulk_write(orm_execute_state):
+    """
+    Bulk UPDATE and DELETE statements on jobs skip the flush hooks, so look up
+    the rows they match first and refresh those once the statement has run.
+    """
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ is not Job:
+        return None
+
+    statement = orm_execute_state.statement
+    connection = orm_execute_state.session.connection(bind_arguments={"clause": statement})
+    matched = select(Job.id)
+    if statement.whereclause is not None:
+        matched = matched.where(statement.whereclause)
+    job_ids = connection.scalars(matched).all()
+    result = orm_execute_state.invoke_statement()
+    refresh_job_listings(connection, job_ids)
+    return result
+
+
+@event.listens_for(Session, "after_flush")
+def sync_job_listings(session, flush_context) -> None:
+    """
+    Keep job_listings in step with every flushed change to the rows it copies.
+
+    Runs in the flush's transaction, so the read model commits or rolls back
+    together with the change that caused it.
+    """
+    changed = list(chain(session.new, session.dirty, session.deleted))
+    job_ids = {obj.id for obj in changed if isinstance(obj, Job)}
+    employers = [obj for obj in session.dirty if isinstance(obj, Employer) and _changed(obj, "name")]
+    categories = [
+        obj for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, Category) and (obj in session.deleted or _changed(obj, "name", "slug"))
+    ]
+    if not (job_ids or employers or categories):
+        return
+
+    connection = session.connection()
+    if job_ids:
+        refresh_job_listings(connection, job_ids)
+    # Renames change what the listing shows, so they move updated_at (and with
+    # it the listing validators) forward like an edit to the job would
+    now = datetime.now(timezone.utc)
+    for employer in employers:
+        connection.execute(
+            update(JobListing)
+            .where(JobListing.employer_id == employer.id)
+            .values(employer_name=employer.name, updated_at=now)
+        )
+    for category in categories:
+        if category in session.deleted:
+            values = {"category_id": None, "category_slug": None, "category_name": None}
+        else:
+            values = {"category_slug": category.slug, "category_name": category.name}
+        connection.execute(update(JobListing).where(JobListing.category_id == category.id).values(updated_at=now, **values))
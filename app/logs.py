@@ -0,0 +1,118 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.config import settings
+
+# Attributes every LogRecord has; anything else was passed with `extra=` and is
+# emitted as a structured field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of the records below WARNING for chosen loggers.
+
+    Rates apply to a logger and its children, the most specific name winning;
+    warnings and errors are never sampled out.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def rate_for(self, name: str) -> float:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting, tracebacks included, to the listener.
+
+    The stock prepare() formats the record on the calling thread and folds the
+    traceback into the message, so JsonFormatter never saw exc_info. The queue
+    is in-process and needs nothing pickled; only the message arguments are
+    merged here, so later changes to them cannot alter the logged message.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging() -> None:
+    """
+    Route all logging through a queue drained by a background listener thread.
+
+    Request code only pays for the level check and, when enabled, putting the
+    record on an in-memory queue; formatting and writing to stdout happen on the
+    listener thread. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_json else logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s: %(message)s"
+    ))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = RecordQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.log_sampling))
+
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+    for name, level in settings.log_levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
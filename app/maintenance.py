@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+from app.models import Job
+
+
+def backfill_description_html(db: Session, batch_size: int = 500, force: bool = False) -> int:
+    """
+    Render and store description HTML for jobs that do not have it yet.
+
+    Walks the jobs table in primary-key batches, committing after each batch,
+    so it can run against a live database without holding a long transaction.
+
+    Args:
+        db: Database session
+        batch_size: Number of jobs rendered per transaction
+        force: Re-render every job, not only those missing stored HTML
+
+    Returns:
+        Number of jobs rendered
+    """
+    rendered = 0
+    last_id = 0
+    while True:
+        query = db.query(Job).filter(Job.id > last_id)
+        if not force:
+            query = query.filter(Job.description_html.is_(None))
+        batch = query.order_by(Job.id).limit(batch_size).all()
+        if not batch:
+            return rendered
+
+        for job in batch:
+            job.render_description()
+        db.commit()
+
+        rendered += len(batch)
+        last_id = batch[-1].id
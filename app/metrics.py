@@ -0,0 +1,255 @@
+import atexit
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+import jinja2
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+from app.config import settings
+
+# Set PROMETHEUS_MULTIPROC_DIR (an empty directory shared by the workers) before
+# starting uvicorn with several workers; each worker then writes its samples
+# there and /metrics aggregates all of them.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+METRICS_MEDIA_TYPE = CONTENT_TYPE_LATEST
+
+# Finer around the 300 ms P95 budget
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+RENDER_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Route label for requests that matched no route
+UNMATCHED_ROUTE = "unmatched"
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", ["method"], multiprocess_mode="livesum",
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Time to send the full response", ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements executed per request", ["route"], buckets=QUERY_COUNT_BUCKETS,
+)
+db_query_seconds_per_request = Histogram(
+    "db_query_seconds_per_request", "Time spent in SQL statements per request", ["route"], buckets=LATENCY_BUCKETS,
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "Time to execute one SQL statement", buckets=RENDER_BUCKETS,
+)
+template_render_seconds = Histogram(
+    "template_render_seconds", "Time to render a page template, Markdown included", ["template"], buckets=RENDER_BUCKETS,
+)
+markdown_render_seconds = Histogram(
+    "markdown_render_seconds", "Time to render one Markdown document, cache hits included", buckets=RENDER_BUCKETS,
+)
+markdown_cache_hits_total = Counter(
+    "markdown_cache_hits_total", "Markdown documents served from the render cache",
+)
+markdown_cache_misses_total = Counter(
+    "markdown_cache_misses_total", "Markdown documents rendered because they were not cached",
+)
+markdown_cache_entries = Gauge(
+    "markdown_cache_entries", "Rendered documents held in the render cache", multiprocess_mode="livesum",
+)
+auth_verification_seconds = Histogram(
+    "auth_verification_seconds", "Time to verify a session, CSRF token or password", ["kind"], buckets=RENDER_BUCKETS,
+)
+password_hash_in_flight = Gauge(
+    "password_hash_in_flight", "bcrypt calls running or queued on the hashing pool", multiprocess_mode="livesum",
+)
+password_hash_queue_depth = Gauge(
+    "password_hash_queue_depth", "bcrypt calls waiting for a free hashing worker", multiprocess_mode="livesum",
+)
+password_hash_rejected_total = Counter(
+    "password_hash_rejected_total", "bcrypt calls answered with 503 because the hashing pool was full",
+)
+
+
+@dataclass
+class RequestStats:
+    """Time and work attributed to the request being handled"""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    template_seconds: float = 0.0
+    markdown_seconds: float = 0.0
+    auth_seconds: float = 0.0
+
+
+# Set by the middleware; handlers run in copies of the request's context (the
+# threadpool included), which all share this one mutable object
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request"""
+    return _request_stats.get()
+
+
+@contextmanager
+def timed(histogram: Histogram, field: str, *labels: str) -> Iterator[None]:
+    """Observe the block's duration and add it to the current request's `field`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        (histogram.labels(*labels) if labels else histogram).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            setattr(stats, field, getattr(stats, field) + elapsed)
+
+
+class TimedTemplate(jinja2.Template):
+    """Jinja2 template class recording how long each page takes to render"""
+
+    def render(self, *args, **kwargs) -> str:
+        with timed(template_render_seconds, "template_seconds", self.name or "<string>"):
+            return super().render(*args, **kwargs)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    db_query_duration_seconds.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    """
+    Server-Timing header value breaking a response's time down by component.
+
+    Markdown is usually rendered inside templates, so `template` includes it;
+    `app` is whatever the other entries do not account for (routing, the
+    middleware and handler code).
+    """
+    def entry(name: str, seconds: float, description: str) -> str:
+        return f'{name};dur={seconds * 1000:.1f};desc="{description}"'
+
+    accounted = stats.db_seconds + stats.template_seconds + stats.auth_seconds
+    return ", ".join([
+        entry("db", stats.db_seconds, f"Database ({stats.db_queries} queries)"),
+        entry("markdown", stats.markdown_seconds, "Markdown"),
+        entry("template", stats.template_seconds, "Templates"),
+        entry("auth", stats.auth_seconds, "Auth checks"),
+        entry("app", max(0.0, total_seconds - accounted), "Middleware and handlers"),
+        entry("total", total_seconds, "Total"),
+    ])
+
+
+def server_timing_enabled(scope) -> bool:
+    """SERVER_TIMING=all for every response, admin for admin sessions only"""
+    mode = settings.server_timing
+    return mode == "all" or (mode == "admin" and bool(scope.get("is_admin")))
+
+
+def route_template(scope) -> str:
+    """
+    The path template a request was routed to, e.g. /jobs/{job_id}.
+
+    Read from the scope when the router ran; responses served before routing
+    (response cache hits) are matched against the routes here instead.
+    """
+    route = scope.get("route")
+    if route is None:
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match != Match.NONE:
+                route = candidate
+                break
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Count and time every HTTP request by method, route template and status.
+
+    Added outermost, so response cache hits are measured too. Also adds the
+    Server-Timing header when enabled; it covers the time up to the start of
+    the response, so the body of a streamed response is not included.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        method = scope["method"]
+        status_code = 500
+
+        async def record_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if server_timing_enabled(scope):
+                    header = server_timing(stats, time.perf_counter() - start)
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1")),
+                    ])
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            _request_stats.reset(token)
+            route = route_template(scope)
+            http_requests_total.labels(method, route, str(status_code)).inc()
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            db_queries_per_request.labels(route).observe(stats.db_queries)
+            db_query_seconds_per_request.labels(route).observe(stats.db_seconds)
+
+
+def scrape_authorized(authorization: Optional[str]) -> bool:
+    """Whether an Authorization header carries the configured METRICS_TOKEN"""
+    if not settings.metrics_token or not authorization:
+        return False
+    scheme, _, token = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), settings.metrics_token.encode())
+
+
+def render_metrics() -> bytes:
+    """Every metric in the Prometheus text format, summed across workers in multiprocess mode"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+if MULTIPROCESS:
+    # Drop this worker's live gauges when it exits
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
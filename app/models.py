@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, DDL, Index, Table, event, select
+from sqlalchemy.orm import relationship, Session, attributes
 from app.database import Base
 from app.config import settings
+from app.utils import parse_tags, slugify_tag, render_markdown, markdown_excerpt
 
 
 class EmployerAccount(Base):
@@ -33,6 +34,11 @@ class Employer(Base):
     website = Column(String(255))
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     
     # Link to employer account
     account_id = Column(Integer, ForeignKey("employer_accounts.id"))
@@ -49,16 +55,49 @@ class Category(Base):
     slug = Column(String(100), nullable=False, unique=True)
     description = Column(Text)
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     
     jobs = relationship("Job", back_populates="category")
 
 
+# Association between jobs and their normalized tags. The composite primary key
+# serves job -> tags lookups; ix_job_tags_tag_id_job_id serves tag -> jobs filtering.
+job_tags = Table(
+    "job_tags",
+    Base.metadata,
+    Column("job_id", Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_job_tags_tag_id_job_id", "tag_id", "job_id"),
+)
+
+
+class Tag(Base):
+    __tablename__ = "tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    slug = Column(String(100), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    jobs = relationship("Job", secondary=job_tags, back_populates="normalized_tags")
+
+    __table_args__ = (
+        Index("ix_tags_slug", "slug", unique=True),
+    )
+
+
 class Job(Base):
     __tablename__ = "jobs"
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
+    description_html = Column(Text)  # Rendered from description on save
+    excerpt_html = Column(Text)  # Leading part of the description, for job cards
     tags = Column(String(500))  # Comma-separated tags
     salary_min = Column(Integer)
     salary_max = Column(Integer)
@@ -76,11 +115,19 @@ class Job(Base):
     category_id = Column(Integer, ForeignKey("categories.id"))
     category = relationship("Category", back_populates="jobs")
     
+    # Normalized tags, kept in sync with the `tags` string on flush
+    normalized_tags = relationship("Tag", secondary=job_tags, back_populates="jobs")
+    
     # Status and timestamps
     status = Column(String(20), default="draft")  # draft, published, expired, refunded
     created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     published_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     
     # Stripe payment info
     stripe_payment_intent_id = Column(String(255))
@@ -92,6 +139,20 @@ class Job(Base):
     refund_processed_at = Column(DateTime(timezone=True))
     refund_reason = Column(Text)
     
+    __table_args__ = (
+        # Serves the public "active published jobs, newest first" listing
+        Index("ix_jobs_status_published_at_expires_at", status, published_at.desc(), expires_at),
+        Index(
+            "ix_jobs_published_active",
+            published_at.desc(),
+            expires_at,
+            sqlite_where=status == "published",
+            postgresql_where=status == "published",
+        ),
+        # Newest change to any job, for conditional GET validators
+        Index("ix_jobs_updated_at", updated_at),
+    )
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if self.status == "published" and not self.published_at:
@@ -125,11 +186,14 @@ class Job(Base):
         refund_deadline = published_at + timedelta(hours=settings.refund_window_hours)
         return datetime.now(timezone.utc) <= refund_deadline
     
+    def render_description(self) -> None:
+        """Store sanitized HTML for the description and its card excerpt"""
+        self.description_html = str(render_markdown(self.description))
+        self.excerpt_html = str(render_markdown(markdown_excerpt(self.description)))
+    
     @property
     def tag_list(self) -> list[str]:
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(",")]
-        return []
+        return parse_tags(self.tags)
     
     def to_dict(self) -> dict:
         return {
@@ -147,5 +211,214 @@ class Job(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "published_at": self.published_at.isoformat() if self.published_at else None,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "can_refund": self.can_refund,
-        } 
\ No newline at end of file
+        }
+
+
+class JobArchive(Base):
+    """
+    Expired, refunded and abandoned draft jobs moved out of `jobs` once past
+    the retention window. Rows keep their original id, so old links still resolve.
+    """
+    __tablename__ = "jobs_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    description_html = Column(Text)
+    excerpt_html = Column(Text)
+    tags = Column(String(500))
+    salary_min = Column(Integer)
+    salary_max = Column(Integer)
+    salary_currency = Column(String(3))
+    apply_url = Column(String(500), nullable=False)
+    employer_id = Column(Integer, ForeignKey("employers.id"), nullable=False)
+    employer_account_id = Column(Integer, ForeignKey("employer_accounts.id"))
+    category_id = Column(Integer, ForeignKey("categories.id"))
+    status = Column(String(20))
+    created_at = Column(DateTime(timezone=True))
+    published_at = Column(DateTime(timezone=True))
+    expires_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    stripe_payment_intent_id = Column(String(255))
+    payment_completed = Column(Boolean)
+    payment_amount = Column(Integer)
+    refund_requested_at = Column(DateTime(timezone=True))
+    refund_processed_at = Column(DateTime(timezone=True))
+    refund_reason = Column(Text)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    employer = relationship("Employer", viewonly=True)
+    category = relationship("Category", viewonly=True)
+
+
+class JobListing(Base):
+    """
+    Read model of the active jobs, holding each card's fields ready to display.
+
+    One row per published job, kept in step with jobs, employers and categories
+    by app.listings, so public listings are read from this table alone.
+    """
+    __tablename__ = "job_listings"
+
+    id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    employer_id = Column(Integer, nullable=False)
+    employer_name = Column(String(255), nullable=False)
+    category_id = Column(Integer)
+    category_slug = Column(String(100))
+    category_name = Column(String(100))
+    tags = Column(String(500))  # Comma-separated tags, as written on the job
+    excerpt_html = Column(Text)
+    salary = Column(String(100))  # e.g. "$120,000 - $150,000 USD"; None without a full range
+    published_at = Column(DateTime(timezone=True), nullable=False)
+    published_date = Column(String(20), nullable=False)  # e.g. "Oct 17, 2026"
+    updated_at = Column(DateTime(timezone=True))  # Latest change to the job or its employer or category
+
+    __table_args__ = (
+        # Newest first, as every listing and its keyset pagination read them
+        Index("ix_job_listings_published_at_id", published_at.desc(), id.desc()),
+        Index("ix_job_listings_category_slug_published_at_id", category_slug, published_at.desc(), id.desc()),
+        Index("ix_job_listings_employer_id", employer_id),
+        Index("ix_job_listings_category_id", category_id),
+        # Listing validators read the newest change on every conditional GET
+        Index("ix_job_listings_updated_at", updated_at),
+    )
+
+    @property
+    def tag_list(self) -> list[str]:
+        return parse_tags(self.tags)
+
+
+class SchedulerLease(Base):
+    """Which worker runs a periodic task, held until expires_at unless renewed"""
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+def _tag_slugs(job: "Job") -> dict[str, str]:
+    """Map each distinct tag slug of a job to the first name spelled that way"""
+    slugs = {}
+    for name in parse_tags(job.tags):
+        slug = slugify_tag(name)[:100]
+        if slug:
+            slugs.setdefault(slug, name[:100])
+    return slugs
+
+
+@event.listens_for(Session, "before_flush")
+def sync_normalized_tags(session, flush_context, instances) -> None:
+    """Rebuild Job.normalized_tags for new jobs and jobs whose tag string changed"""
+    jobs = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Job)
+        and (obj in session.new or attributes.get_history(obj, "tags").has_changes())
+    ]
+    if not jobs:
+        return
+
+    slugs_by_job = {job: _tag_slugs(job) for job in jobs}
+    names_by_slug = {}
+    for slugs in slugs_by_job.values():
+        for slug, name in slugs.items():
+            names_by_slug.setdefault(slug, name)
+
+    with session.no_autoflush:
+        tags_by_slug = {tag.slug: tag for tag in session.new if isinstance(tag, Tag)}
+        missing = set(names_by_slug) - set(tags_by_slug)
+        if missing:
+            existing = session.scalars(select(Tag).where(Tag.slug.in_(missing)))
+            tags_by_slug.update({tag.slug: tag for tag in existing})
+        for slug in set(names_by_slug) - set(tags_by_slug):
+            tags_by_slug[slug] = Tag(name=names_by_slug[slug], slug=slug)
+            session.add(tags_by_slug[slug])
+
+        for job, slugs in slugs_by_job.items():
+            job.normalized_tags = [tags_by_slug[slug] for slug in slugs]
+
+
+@event.listens_for(Session, "before_flush")
+def sync_description_html(session, flush_context, instances) -> None:
+    """Re-render stored description HTML for new jobs and edited descriptions"""
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Job) and (
+            obj in session.new or attributes.get_history(obj, "description").has_changes()
+        ):
+            obj.render_description()
+
+
+@event.listens_for(Session, "before_flush")
+def sync_expiry_status(session, flush_context, instances) -> None:
+    """
+    Keep status in step with expires_at for jobs written through the ORM.
+
+    A published job saved with a passed expiry is marked expired straight away
+    rather than waiting for the sweeper, and an expired job whose expiry is
+    moved into the future is listed again.
+    """
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Job):
+            continue
+        if obj.status == "published" and obj.is_expired:
+            obj.status = "expired"
+        elif (
+            obj.status == "expired"
+            and obj not in session.new
+            and obj.expires_at is not None
+            and not obj.is_expired
+            and attributes.get_history(obj, "expires_at").has_changes()
+        ):
+            obj.status = "published"
+
+
+# Full-text search index over jobs (SQLite FTS5). It is an external-content table,
+# so it stores only the index and is kept in sync with `jobs` by triggers.
+JOBS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, tags, description,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, tags, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+        INSERT INTO jobs_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+]
+
+
+def _sqlite_has_fts5(ddl, target, bind, **kw) -> bool:
+    """Only create the FTS index on SQLite builds compiled with FTS5"""
+    if bind.dialect.name != "sqlite":
+        return False
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+for _statement in JOBS_FTS_DDL:
+    event.listen(Job.__table__, "after_create", DDL(_statement).execute_if(callable_=_sqlite_has_fts5))
+event.listen(Job.__table__, "before_drop", DDL("DROP TABLE IF EXISTS jobs_fts").execute_if(dialect="sqlite"))
+
+# The hooks keeping job_listings in step live in app.listings; importing it here
+# registers them for every entry point that loads the models, scripts included
+import app.listings  # noqa: E402,F401
@@ -0,0 +1,92 @@
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Query
+from app.models import JobListing
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+@dataclass
+class Page:
+    items: list = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    """Serialize a page position into an opaque, URL-safe cursor"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """Inverse of encode_cursor; raises InvalidCursor for malformed input"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+    if not isinstance(position, dict):
+        raise InvalidCursor("cursor must encode an object")
+    return position
+
+
+def paginate_newest_first(query: Query, cursor: Optional[str], page_size: int) -> Page:
+    """
+    Keyset-paginate a JobListing query on (published_at, id), newest first.
+
+    The cursor holds the last (published_at, id) already shown, and the next page
+    is read with a range condition on published_at, so every page costs the same
+    index seek however deep the user scrolls. Listed jobs always carry a
+    published_at, which is what makes it a usable key.
+    """
+    query = query.order_by(JobListing.published_at.desc(), JobListing.id.desc())
+
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            published_at = datetime.fromisoformat(position["published_at"])
+            last_id = int(position["id"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidCursor(str(e)) from e
+        # Written as a range on published_at plus a tie-break so the index can seek
+        query = query.filter(
+            JobListing.published_at <= published_at,
+            or_(JobListing.published_at < published_at, JobListing.id < last_id)
+        )
+
+    rows = query.limit(page_size + 1).all()
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = encode_cursor({"published_at": last.published_at.isoformat(), "id": last.id})
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def paginate_ranked(query: Query, cursor: Optional[str], page_size: int) -> Page:
+    """
+    Paginate an already-ordered query (e.g. BM25-ranked search) by offset.
+
+    Relevance order has no stable key to seek on, and ranking has to score every
+    match before sorting anyway, so an offset adds cost only in proportion to
+    the number of matches, not the size of the table.
+    """
+    offset = 0
+    if cursor:
+        try:
+            offset = int(decode_cursor(cursor)["offset"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise InvalidCursor(str(e)) from e
+        if offset < 0:
+            raise InvalidCursor("offset must not be negative")
+
+    rows = query.offset(offset).limit(page_size + 1).all()
+    items = rows[:page_size]
+    next_cursor = encode_cursor({"offset": offset + page_size}) if len(rows) > page_size else None
+    return Page(items=items, next_cursor=next_cursor)
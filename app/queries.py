@@ -0,0 +1,64 @@
+from sqlalchemy import literal_column
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from app.models import Job, JobListing, Employer, Category
+
+
+def job_listing_query(db: Session) -> Query:
+    """
+    Base query for any page that lists jobs.
+
+    Eager-loads the employer and category each job card or table row displays,
+    so a listing costs the same number of statements however many jobs it shows.
+    """
+    return db.query(Job).options(
+        joinedload(Job.employer, innerjoin=True),
+        joinedload(Job.category),
+    )
+
+
+def active_jobs_query(db: Session) -> Query:
+    """
+    Query for published, unexpired jobs. Callers add their own ordering.
+
+    The status is compared against a literal rather than a bound parameter so
+    the planner can prove the partial index ix_jobs_published_active applies.
+    """
+    return job_listing_query(db).filter(*active_jobs_criteria())
+
+
+def active_jobs_criteria() -> tuple:
+    """
+    Filter criteria shared by every query over published, unexpired jobs.
+
+    The expiry sweeper moves jobs past expires_at to status 'expired', so the
+    status alone identifies the active jobs.
+    """
+    return (Job.status == literal_column("'published'"),)
+
+
+def job_listings_query(db: Session) -> Query:
+    """
+    Query for the public job cards. Callers add their own ordering.
+
+    Reads the job_listings read model, which holds only active jobs with their
+    employer, category and display strings copied in, so a listing page is a
+    single-table read with no joins or per-row formatting.
+    """
+    return db.query(JobListing)
+
+
+def employer_jobs_query(db: Session, employer_account_id: int) -> Query:
+    """Jobs owned by an employer account, newest first"""
+    return job_listing_query(db).filter(
+        Job.employer_account_id == employer_account_id
+    ).order_by(Job.created_at.desc())
+
+
+def employers_with_jobs_query(db: Session) -> Query:
+    """Employers with their jobs loaded in one extra statement"""
+    return db.query(Employer).options(selectinload(Employer.jobs))
+
+
+def categories_with_jobs_query(db: Session) -> Query:
+    """Categories with their jobs loaded in one extra statement"""
+    return db.query(Category).options(selectinload(Category.jobs))
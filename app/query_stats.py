@@ -0,0 +1,169 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Durations kept per fingerprint for the p95
+SAMPLES_PER_FINGERPRINT = 512
+
+# Distinct fingerprints tracked; statements beyond that are pooled together
+MAX_FINGERPRINTS = 1000
+OTHER_FINGERPRINT = "<other statements>"
+
+# Orderings offered on the diagnostics page
+SORT_OPTIONS = {
+    "total_seconds": "Total time",
+    "count": "Calls",
+    "p95_seconds": "p95",
+    "max_seconds": "Max",
+}
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES (?:\((?:\?, )*\?\), )*\((?:\?, )*\?\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize a statement so calls differing only in values group together.
+
+    Literals and bound-parameter placeholders become `?`, IN lists and
+    multi-row VALUES collapse to one entry, and whitespace is squeezed.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_LIST.sub("VALUES (...)", normalized)
+    return normalized
+
+
+@dataclass
+class FingerprintStats:
+    """Timings of every statement sharing one fingerprint"""
+
+    fingerprint: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_count: int = 0
+    plan: Optional[str] = None
+    samples: deque = field(default_factory=lambda: deque(maxlen=SAMPLES_PER_FINGERPRINT))
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.count if self.count else 0.0
+
+    @property
+    def p95_seconds(self) -> float:
+        """95th percentile of the most recent executions"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class QueryStats:
+    """Per-process statement statistics, keyed by fingerprint"""
+
+    def __init__(self):
+        self._entries: dict[str, FingerprintStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, slow: bool = False) -> FingerprintStats:
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= MAX_FINGERPRINTS:
+                    key = OTHER_FINGERPRINT
+                entry = self._entries.setdefault(key, FingerprintStats(key))
+            entry.count += 1
+            entry.total_seconds += seconds
+            entry.max_seconds = max(entry.max_seconds, seconds)
+            entry.samples.append(seconds)
+            if slow:
+                entry.slow_count += 1
+            return entry
+
+    def top(self, limit: int, sort: str = "total_seconds") -> list[FingerprintStats]:
+        """The `limit` fingerprints with the highest `sort` attribute"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return sorted(entries, key=lambda entry: getattr(entry, sort), reverse=True)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+query_stats = QueryStats()
+
+
+def explain(cursor, statement: str, parameters, dialect_name: str) -> Optional[str]:
+    """
+    The database's plan for a SELECT, run on a fresh DBAPI cursor so it is not
+    itself instrumented. Returns None for other statements or if EXPLAIN fails.
+    """
+    if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if dialect_name == "sqlite" else "EXPLAIN "
+    try:
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            rows = explain_cursor.fetchall()
+        finally:
+            explain_cursor.close()
+    except Exception as e:
+        logger.debug("EXPLAIN failed: %s", e)
+        return None
+    return "\n".join(" | ".join(str(column) for column in row) for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    threshold = settings.slow_query_threshold_ms
+    slow = bool(threshold) and elapsed * 1000 >= threshold
+    entry = query_stats.record(statement, elapsed, slow=slow)
+    if not slow:
+        return
+
+    # EXPLAIN once per fingerprint; later slow runs reuse the stored plan
+    if entry.plan is None and not executemany:
+        entry.plan = explain(cursor, statement, parameters, conn.dialect.name) or ""
+    logger.warning(
+        "Slow query (%.1f ms): %s",
+        elapsed * 1000,
+        entry.fingerprint,
+        extra={"duration_ms": round(elapsed * 1000, 1), "fingerprint": entry.fingerprint, "plan": entry.plan or None},
+    )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record statement fingerprints and log slow statements for `engine`"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
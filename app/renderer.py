@@ -0,0 +1,118 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+import markdown
+from markupsafe import Markup
+from app.config import settings
+from app.metrics import markdown_cache_entries, markdown_cache_hits_total, markdown_cache_misses_total
+
+MARKDOWN_EXTENSIONS = [
+    'markdown.extensions.fenced_code',      # Code blocks with ```
+    'markdown.extensions.tables',           # Tables
+    'markdown.extensions.nl2br',            # Newlines to <br>
+    'markdown.extensions.sane_lists',       # Better list handling
+    'markdown.extensions.attr_list',        # Attribute lists
+]
+
+_HTML_TAG_PATTERN = re.compile(r'<([^>]+)>')
+
+_local = threading.local()
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered HTML keyed by content hash and safe flag"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, bool], Markup] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, safe: bool) -> tuple[str, bool]:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(), safe
+
+    def get(self, key: tuple[str, bool]):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: tuple[str, bool], html: Markup) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+cache = RenderCache(settings.markdown_cache_size)
+
+
+def _parser() -> markdown.Markdown:
+    """Return this thread's Markdown instance, creating it on first use"""
+    md = getattr(_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS, output_format='html5')
+        _local.md = md
+    return md
+
+
+def render(text: str, safe: bool = True) -> Markup:
+    """
+    Render markdown to HTML, serving repeated documents from the LRU cache.
+
+    Markdown instances are not thread-safe, so each thread keeps its own and
+    resets it between documents instead of rebuilding the extension pipeline.
+    """
+    if not text:
+        return Markup("")
+
+    key = cache.key(text, safe)
+    html = cache.get(key)
+    if html is not None:
+        markdown_cache_hits_total.inc()
+        return html
+    markdown_cache_misses_total.inc()
+
+    source = _HTML_TAG_PATTERN.sub(r'&lt;\1&gt;', text) if safe else text
+    md = _parser()
+    try:
+        html = Markup(md.convert(source))
+    finally:
+        md.reset()
+
+    cache.put(key, html)
+    markdown_cache_entries.set(cache.info().currsize)
+    return html
+
+
+def cache_info() -> CacheInfo:
+    """Hit/miss counters and size of the render cache, for sizing it"""
+    return cache.info()
@@ -0,0 +1,115 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(NamedTuple):
+    """A function of a session run every `interval` seconds"""
+
+    name: str
+    interval: float
+    run: Callable[[Session], object]
+
+
+def acquire_lease(db: Session, name: str, holder: str, ttl: float, now: Optional[datetime] = None) -> bool:
+    """
+    Take or renew the lease row for `name`, valid for `ttl` seconds.
+
+    Succeeds when the lease is free, expired or already held by `holder`; the
+    check and the write are one UPDATE, so two workers can never both win.
+    Commits on success, rolls back otherwise.
+    """
+    now = now or datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=ttl)
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(SchedulerLease.holder == holder, SchedulerLease.expires_at <= now),
+        )
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # Either nobody has taken it yet, or another worker holds it
+        try:
+            db.add(SchedulerLease(name=name, holder=holder, expires_at=expires_at))
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return False
+    db.commit()
+    return True
+
+
+class Scheduler:
+    """
+    Runs periodic tasks on a daemon thread in every worker.
+
+    Before each run a worker takes the task's lease row, so with several
+    workers (or several hosts sharing a database) only one runs a task per
+    interval. The holder renews the lease every run; if it dies, another worker
+    takes over once the lease expires after two intervals.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], holder: Optional[str] = None):
+        self.session_factory = session_factory
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.tasks: list[PeriodicTask] = []
+        self._next_run: dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, interval: float, run: Callable[[Session], object]) -> None:
+        self.tasks.append(PeriodicTask(name, interval, run))
+
+    def run_task(self, task: PeriodicTask) -> bool:
+        """Run `task` if this worker gets its lease; returns whether it ran"""
+        with self.session_factory() as db:
+            try:
+                if not acquire_lease(db, task.name, self.holder, ttl=task.interval * 2):
+                    return False
+                task.run(db)
+            except Exception:
+                logger.exception("Periodic task %s failed", task.name)
+                db.rollback()
+            return True
+
+    def run_pending(self) -> float:
+        """Run the tasks that are due; returns seconds until the next one is"""
+        now = time.monotonic()
+        for task in self.tasks:
+            if self._next_run.get(task.name, 0) <= now:
+                self._next_run[task.name] = now + task.interval
+                self.run_task(task)
+        return max(0.0, min(self._next_run.values(), default=now + 60) - time.monotonic())
+
+    def _loop(self) -> None:
+        delay = 0.0
+        while not self._stop.wait(delay):
+            delay = self.run_pending()
+
+    def start(self) -> None:
+        if self._thread is not None or not self.tasks:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
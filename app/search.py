@@ -0,0 +1,99 @@
+import re
+from typing import Optional
+from sqlalchemy import or_, text, table, column, select, func
+from sqlalchemy.orm import Query, Session
+from app.models import JobListing, Tag, job_tags
+from app.utils import parse_tags, slugify_tag
+
+# bm25() column weights, in FTS column order: title, tags, description
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+jobs_fts = table("jobs_fts", column("rowid"))
+
+# Whether jobs_fts exists, per database URL. Looked up once per process, since
+# HTMX sends a search on every keystroke; migrations that add or drop the
+# index take effect on restart.
+_fts_available: dict[str, bool] = {}
+
+
+def build_match_query(q: str) -> Optional[str]:
+    """
+    Convert free-form search input into an FTS5 MATCH expression.
+
+    Each word becomes a quoted prefix term, so partially typed words match while
+    the user is still typing and FTS5 operators in the input are treated as text.
+
+    Returns:
+        The MATCH expression, or None if the input contains no searchable words
+    """
+    tokens = _TOKEN_PATTERN.findall(q or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def fts_available(db: Session) -> bool:
+    """Check whether the jobs_fts index exists on the current database"""
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    key = str(bind.url)
+    if key not in _fts_available:
+        result = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+        )
+        _fts_available[key] = result.first() is not None
+    return _fts_available[key]
+
+
+def clear_fts_cache() -> None:
+    """Forget which databases have the FTS index, e.g. after creating or dropping it"""
+    _fts_available.clear()
+
+
+def apply_text_search(query: Query, db: Session, q: str) -> Query:
+    """
+    Restrict a JobListing query to jobs matching `q`.
+
+    Uses the FTS5 index ranked by BM25 when available, and falls back to
+    case-insensitive LIKE matching on title and tags otherwise.
+    """
+    match = build_match_query(q)
+    if match and fts_available(db):
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        return (
+            query.join(jobs_fts, jobs_fts.c.rowid == JobListing.id)
+            .filter(text("jobs_fts MATCH :fts_query").bindparams(fts_query=match))
+            .order_by(text(f"bm25(jobs_fts, {weights})"))
+        )
+
+    return query.filter(
+        or_(
+            JobListing.title.ilike(f"%{q}%"),
+            JobListing.tags.ilike(f"%{q}%")
+        )
+    )
+
+
+def apply_tag_filter(query: Query, tags: str) -> Query:
+    """
+    Restrict a JobListing query to jobs carrying every tag in the comma-separated `tags`.
+
+    Tags are matched exactly on their normalized slug, so "java" does not match
+    "javascript". The lookup goes tags.slug -> job_tags(tag_id, job_id) through
+    indexes, so its cost follows the number of tagged jobs, not the table size.
+    """
+    slugs = {slugify_tag(tag) for tag in parse_tags(tags)} - {""}
+    if not slugs:
+        return query
+
+    matching_job_ids = (
+        select(job_tags.c.job_id)
+        .join(Tag, Tag.id == job_tags.c.tag_id)
+        .where(Tag.slug.in_(slugs))
+        .group_by(job_tags.c.job_id)
+        .having(func.count() == len(slugs))
+    )
+    return query.filter(JobListing.id.in_(matching_job_ids))
@@ -0,0 +1,168 @@
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+from xml.sax.saxutils import escape
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models import JobListing
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+# Shards are served as gzip files, not as XML with a Content-Encoding
+SITEMAP_SHARD_MEDIA_TYPE = "application/gzip"
+
+# Rows fetched per round trip, and <url> entries compressed per chunk
+SHARD_BATCH_SIZE = 1000
+
+
+class ShardSummary(NamedTuple):
+    """A shard listed in the sitemap index"""
+
+    number: int
+    last_modified: Optional[datetime]
+
+
+class ShardStamp(NamedTuple):
+    """Changes whenever a job in the shard's id range is added, edited or leaves the listing"""
+
+    count: int
+    id_sum: Optional[int]
+    last_updated: Optional[datetime]
+
+
+def _w3c(value: Optional[datetime]) -> Optional[str]:
+    """W3C datetime for <lastmod>; SQLite returns naive datetimes stored as UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _url(loc: str, lastmod: Optional[str] = None, changefreq: Optional[str] = None) -> str:
+    parts = [f"  <url>\n    <loc>{escape(loc)}</loc>\n"]
+    if lastmod:
+        parts.append(f"    <lastmod>{lastmod}</lastmod>\n")
+    if changefreq:
+        parts.append(f"    <changefreq>{changefreq}</changefreq>\n")
+    parts.append("  </url>\n")
+    return "".join(parts)
+
+
+def shard_bounds(number: int) -> tuple[int, int]:
+    """Inclusive job id range covered by shard `number` (1-based)"""
+    size = settings.sitemap_shard_size
+    return (number - 1) * size + 1, number * size
+
+
+def sitemap_shards(db: Session) -> list[ShardSummary]:
+    """Every shard holding at least one active job, with its newest change"""
+    shard = ((JobListing.id - 1) // settings.sitemap_shard_size + 1).label("shard")
+    rows = db.execute(
+        select(shard, func.max(JobListing.updated_at))
+        .group_by(shard)
+        .order_by(shard)
+    )
+    return [ShardSummary(number, last_modified) for number, last_modified in rows]
+
+
+def render_index(shards: list[ShardSummary]) -> str:
+    """The /sitemap.xml index pointing at the static pages and each job shard"""
+    base = settings.site_url.rstrip("/")
+    entries = [f"  <sitemap>\n    <loc>{escape(base)}/sitemaps/pages.xml</loc>\n  </sitemap>\n"]
+    for shard in shards:
+        lastmod = _w3c(shard.last_modified)
+        entries.append(
+            f"  <sitemap>\n    <loc>{escape(base)}/sitemaps/jobs-{shard.number}.xml.gz</loc>\n"
+            + (f"    <lastmod>{lastmod}</lastmod>\n" if lastmod else "")
+            + "  </sitemap>\n"
+        )
+    return f'{XML_DECLARATION}<sitemapindex xmlns="{SITEMAP_NS}">\n{"".join(entries)}</sitemapindex>'
+
+
+def render_pages() -> str:
+    """Sitemap of the non-job pages"""
+    base = settings.site_url.rstrip("/")
+    return f'{XML_DECLARATION}<urlset xmlns="{SITEMAP_NS}">\n{_url(base + "/", changefreq="daily")}</urlset>'
+
+
+def shard_stamp(db: Session, number: int) -> ShardStamp:
+    """Cheap aggregate over the shard's id range, used to validate the cached shard"""
+    low, high = shard_bounds(number)
+    row = db.execute(
+        select(func.count(), func.sum(JobListing.id), func.max(JobListing.updated_at))
+        .where(JobListing.id.between(low, high))
+    ).one()
+    return ShardStamp(*row)
+
+
+class ShardCache:
+    """
+    Gzipped shards kept per worker, each valid for as long as its stamp.
+
+    A shard is only rebuilt after a job in its id range changes, so an edit to a
+    recent job never re-renders the older, full shards.
+    """
+
+    def __init__(self):
+        self._entries: dict[int, tuple[ShardStamp, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, number: int, stamp: ShardStamp) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(number)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        return None
+
+    def put(self, number: int, stamp: ShardStamp, body: bytes) -> None:
+        with self._lock:
+            self._entries[number] = (stamp, body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+shard_cache = ShardCache()
+
+
+def iter_shard(engine: Engine, number: int, stamp: ShardStamp) -> Iterator[bytes]:
+    """
+    Stream shard `number` as gzip, compressing each batch as it is read.
+
+    Runs in its own session so it can outlive the request's dependencies. The
+    compressed bytes are also collected and cached once the shard is complete.
+    """
+    low, high = shard_bounds(number)
+    base = settings.site_url.rstrip("/")
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    body = []
+
+    def compress(text: str) -> bytes:
+        data = compressor.compress(text.encode())
+        body.append(data)
+        return data
+
+    with Session(bind=engine) as db:
+        rows = db.execute(
+            select(JobListing.id, JobListing.updated_at, JobListing.published_at)
+            .where(JobListing.id.between(low, high))
+            .order_by(JobListing.id)
+            .execution_options(yield_per=SHARD_BATCH_SIZE)
+        )
+        yield compress(f'{XML_DECLARATION}<urlset xmlns="{SITEMAP_NS}">\n')
+        for batch in rows.partitions():
+            yield compress("".join(
+                _url(f"{base}/jobs/{job_id}", _w3c(updated_at or published_at), "weekly")
+                for job_id, updated_at, published_at in batch
+            ))
+
+    tail = compressor.compress(b"</urlset>") + compressor.flush()
+    body.append(tail)
+    shard_cache.put(number, stamp, b"".join(body))
+    yield tail
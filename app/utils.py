@@ -1,5 +1,13 @@
-import markdown
-from html import escape
+import re
+from typing import Optional
+from app import renderer
+from app.metrics import markdown_render_seconds, timed
+
+_TAG_SLUG_INVALID = re.compile(r"[^\w+#.]+", re.UNICODE)
+_FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+
+# Roughly two card lines' worth of source text
+EXCERPT_MAX_CHARS = 300
 
 
 def render_markdown(text: str, safe: bool = True) -> str:
@@ -11,34 +19,77 @@ def render_markdown(text: str, safe: bool = True) -> str:
         safe: If True, escape HTML to prevent XSS attacks
 
     Returns:
-        Rendered HTML string
+        Rendered HTML string, marked safe for Jinja2
+    """
+    with timed(markdown_render_seconds, "markdown_seconds"):
+        return renderer.render(text, safe=safe)
+
+
+def markdown_excerpt(text: str, max_chars: int = EXCERPT_MAX_CHARS) -> str:
+    """
+    Take the leading Markdown blocks of `text` that fit in about `max_chars`.
+
+    Blocks are split on blank lines outside fenced code, so the excerpt never
+    ends inside an open code fence. The first block is always kept.
+
+    Args:
+        text: The markdown source
+        max_chars: Soft limit on the excerpt length
+
+    Returns:
+        Markdown source for the excerpt
     """
     if not text:
         return ""
 
-    # Escape HTML to prevent XSS attacks
-    # We need to be careful not to escape markdown syntax characters
-    if safe:
-        # Escape HTML tags but preserve markdown syntax
-        import re
-        # Escape HTML tags but not markdown syntax
-        text = re.sub(r'<([^>]+)>', r'&lt;\1&gt;', text)
-
-    # Configure markdown with essential extensions
-    md = markdown.Markdown(
-        extensions=[
-            'markdown.extensions.fenced_code',      # Code blocks with ```
-            'markdown.extensions.tables',           # Tables
-            'markdown.extensions.nl2br',            # Newlines to <br>
-            'markdown.extensions.sane_lists',       # Better list handling
-            'markdown.extensions.attr_list',        # Attribute lists
-        ],
-        output_format='html5'
-    )
-
-    # Render markdown to HTML
-    html = md.convert(text)
-
-    # Mark the HTML as safe for Jinja2
-    from markupsafe import Markup
-    return Markup(html) 
\ No newline at end of file
+    blocks, current, in_fence = [], [], False
+    for line in text.splitlines():
+        if _FENCE_PATTERN.match(line):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+
+    excerpt, length = [], 0
+    for block in blocks:
+        if excerpt and length + len(block) > max_chars:
+            break
+        excerpt.append(block)
+        length += len(block)
+    return "\n\n".join(excerpt)
+
+
+def parse_tags(tags: Optional[str]) -> list[str]:
+    """
+    Split a comma-separated tag string into trimmed, non-empty tag names.
+
+    Args:
+        tags: Comma-separated tags as entered by the employer
+
+    Returns:
+        List of tag names in their original order
+    """
+    if not tags:
+        return []
+    return [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+
+def slugify_tag(tag: str) -> str:
+    """
+    Normalize a tag name so that equivalent spellings match.
+
+    Lowercases the name and collapses whitespace and punctuation into hyphens,
+    keeping characters that are meaningful in technology names (c++, c#, node.js).
+
+    Args:
+        tag: The tag name to normalize
+
+    Returns:
+        The tag slug, or an empty string if nothing usable remains
+    """
+    return _TAG_SLUG_INVALID.sub("-", tag.strip().lower()).strip("-")
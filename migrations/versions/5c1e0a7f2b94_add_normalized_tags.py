@@ -0,0 +1,83 @@
+"""Add normalized tags and job_tags association
+
+Revision ID: 5c1e0a7f2b94
+Revises: 93423b8a6d08
+Create Date: 2026-10-16 10:03:17.228410
+
+"""
+import re
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e0a7f2b94'
+down_revision: Union[str, Sequence[str], None] = '93423b8a6d08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Frozen copy of app.utils.slugify_tag at the time of this revision
+_TAG_SLUG_INVALID = re.compile(r"[^\w+#.]+", re.UNICODE)
+
+
+def _slugify(tag: str) -> str:
+    return _TAG_SLUG_INVALID.sub("-", tag.strip().lower()).strip("-")[:100]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tags = op.create_table(
+        'tags',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('slug', sa.String(length=100), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tags_id', 'tags', ['id'], unique=False)
+    op.create_index('ix_tags_slug', 'tags', ['slug'], unique=True)
+
+    job_tags = op.create_table(
+        'job_tags',
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('tag_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('job_id', 'tag_id'),
+    )
+    op.create_index('ix_job_tags_tag_id_job_id', 'job_tags', ['tag_id', 'job_id'], unique=False)
+
+    # Backfill from the comma-separated jobs.tags column
+    bind = op.get_bind()
+    jobs = sa.table('jobs', sa.column('id', sa.Integer), sa.column('tags', sa.String))
+
+    tag_ids = {}
+    links = []
+    now = datetime.now(timezone.utc)
+    for job_id, raw_tags in bind.execute(sa.select(jobs.c.id, jobs.c.tags).where(jobs.c.tags.isnot(None))):
+        seen = set()
+        for name in (tag.strip() for tag in raw_tags.split(",")):
+            slug = _slugify(name)
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            if slug not in tag_ids:
+                result = bind.execute(tags.insert().values(name=name[:100], slug=slug, created_at=now))
+                tag_ids[slug] = result.inserted_primary_key[0]
+            links.append({'job_id': job_id, 'tag_id': tag_ids[slug]})
+
+    if links:
+        op.bulk_insert(job_tags, links)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_tags_tag_id_job_id', table_name='job_tags')
+    op.drop_table('job_tags')
+    op.drop_index('ix_tags_slug', table_name='tags')
+    op.drop_index('ix_tags_id', table_name='tags')
+    op.drop_table('tags')
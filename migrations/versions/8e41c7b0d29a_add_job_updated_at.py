@@ -0,0 +1,34 @@
+"""Add updated_at to jobs for conditional GET validators
+
+Existing rows are backfilled from published_at, falling back to created_at.
+
+Revision ID: 8e41c7b0d29a
+Revises: d3f8a2c61e07
+Create Date: 2026-10-16 15:12:44.301927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41c7b0d29a'
+down_revision: Union[str, Sequence[str], None] = 'd3f8a2c61e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE jobs SET updated_at = COALESCE(published_at, created_at)")
+    op.create_index('ix_jobs_updated_at', 'jobs', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_updated_at', table_name='jobs')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('updated_at')
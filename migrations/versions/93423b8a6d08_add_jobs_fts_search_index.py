@@ -0,0 +1,79 @@
+"""Add FTS5 full-text search index for jobs
+
+Revision ID: 93423b8a6d08
+Revises: 049cab5f98fc
+Create Date: 2026-10-16 09:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '93423b8a6d08'
+down_revision: Union[str, Sequence[str], None] = '049cab5f98fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FTS_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, tags, description,
+        content='jobs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, tags, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, tags, description)
+        VALUES ('delete', old.id, old.title, old.tags, old.description);
+        INSERT INTO jobs_fts(rowid, title, tags, description)
+        VALUES (new.id, new.title, new.tags, new.description);
+    END
+    """,
+]
+
+
+def _has_fts5() -> bool:
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    return bool(bind.exec_driver_sql("SELECT sqlite_compileoption_used('ENABLE_FTS5')").scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other backends keep using the LIKE search path
+    if not _has_fts5():
+        return
+
+    for statement in FTS_STATEMENTS:
+        op.execute(statement)
+    # Index the rows that already exist
+    op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS jobs_fts_ai")
+    op.execute("DROP TABLE IF EXISTS jobs_fts")
@@ -0,0 +1,69 @@
+"""Add jobs_archive for expired, refunded and abandoned draft jobs
+
+Revision ID: a6d1f0c93e42
+Revises: f5c9e2a7b318
+Create Date: 2026-10-17 01:52:37.204115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1f0c93e42'
+down_revision: Union[str, Sequence[str], None] = 'f5c9e2a7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns shared with jobs, in table order
+JOB_COLUMNS = (
+    'id, title, description, description_html, excerpt_html, tags, salary_min, salary_max, '
+    'salary_currency, apply_url, employer_id, employer_account_id, category_id, status, '
+    'created_at, published_at, expires_at, updated_at, stripe_payment_intent_id, '
+    'payment_completed, payment_amount, refund_requested_at, refund_processed_at, refund_reason'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'jobs_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('description_html', sa.Text(), nullable=True),
+        sa.Column('excerpt_html', sa.Text(), nullable=True),
+        sa.Column('tags', sa.String(length=500), nullable=True),
+        sa.Column('salary_min', sa.Integer(), nullable=True),
+        sa.Column('salary_max', sa.Integer(), nullable=True),
+        sa.Column('salary_currency', sa.String(length=3), nullable=True),
+        sa.Column('apply_url', sa.String(length=500), nullable=False),
+        sa.Column('employer_id', sa.Integer(), nullable=False),
+        sa.Column('employer_account_id', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('stripe_payment_intent_id', sa.String(length=255), nullable=True),
+        sa.Column('payment_completed', sa.Boolean(), nullable=True),
+        sa.Column('payment_amount', sa.Integer(), nullable=True),
+        sa.Column('refund_requested_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refund_processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('refund_reason', sa.Text(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+        sa.ForeignKeyConstraint(['employer_account_id'], ['employer_accounts.id'], ),
+        sa.ForeignKeyConstraint(['employer_id'], ['employers.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Put archived jobs back so downgrading loses nothing
+    op.execute(f"INSERT INTO jobs ({JOB_COLUMNS}) SELECT {JOB_COLUMNS} FROM jobs_archive")
+    op.drop_table('jobs_archive')
@@ -0,0 +1,43 @@
+"""Add indexes for the active published jobs listing
+
+Revision ID: b7d24e91c3a5
+Revises: 5c1e0a7f2b94
+Create Date: 2026-10-16 11:26:52.640118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e91c3a5'
+down_revision: Union[str, Sequence[str], None] = '5c1e0a7f2b94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_jobs_status_published_at_expires_at',
+        'jobs',
+        ['status', sa.text('published_at DESC'), 'expires_at'],
+        unique=False,
+    )
+    # Partial index limited to published rows, on backends that support it
+    op.create_index(
+        'ix_jobs_published_active',
+        'jobs',
+        [sa.text('published_at DESC'), 'expires_at'],
+        unique=False,
+        sqlite_where=sa.text("status = 'published'"),
+        postgresql_where=sa.text("status = 'published'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_published_active', table_name='jobs')
+    op.drop_index('ix_jobs_status_published_at_expires_at', table_name='jobs')
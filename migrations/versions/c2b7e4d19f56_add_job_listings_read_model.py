@@ -0,0 +1,114 @@
+"""Add the job_listings read model for public job cards
+
+The table is filled from the current published jobs here, since listings are
+served from it alone. Afterwards app.listings keeps it in step.
+
+Revision ID: c2b7e4d19f56
+Revises: a6d1f0c93e42
+Create Date: 2026-10-17 02:36:12.481907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2b7e4d19f56'
+down_revision: Union[str, Sequence[str], None] = 'a6d1f0c93e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows copied per INSERT during the backfill
+BATCH_SIZE = 500
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    job_listings = op.create_table(
+        'job_listings',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('employer_id', sa.Integer(), nullable=False),
+        sa.Column('employer_name', sa.String(length=255), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('category_slug', sa.String(length=100), nullable=True),
+        sa.Column('category_name', sa.String(length=100), nullable=True),
+        sa.Column('tags', sa.String(length=500), nullable=True),
+        sa.Column('excerpt_html', sa.Text(), nullable=True),
+        sa.Column('salary', sa.String(length=100), nullable=True),
+        sa.Column('published_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('published_date', sa.String(length=20), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['id'], ['jobs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_job_listings_published_at_id',
+        'job_listings',
+        [sa.text('published_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_job_listings_category_slug_published_at_id',
+        'job_listings',
+        ['category_slug', sa.text('published_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.create_index('ix_job_listings_employer_id', 'job_listings', ['employer_id'], unique=False)
+    op.create_index('ix_job_listings_category_id', 'job_listings', ['category_id'], unique=False)
+
+    jobs = sa.table(
+        'jobs',
+        sa.column('id', sa.Integer()), sa.column('title', sa.String()), sa.column('employer_id', sa.Integer()),
+        sa.column('category_id', sa.Integer()), sa.column('tags', sa.String()), sa.column('excerpt_html', sa.Text()),
+        sa.column('salary_min', sa.Integer()), sa.column('salary_max', sa.Integer()),
+        sa.column('salary_currency', sa.String()), sa.column('status', sa.String()),
+        sa.column('published_at', sa.DateTime(timezone=True)), sa.column('updated_at', sa.DateTime(timezone=True)),
+    )
+    employers = sa.table('employers', sa.column('id', sa.Integer()), sa.column('name', sa.String()))
+    categories = sa.table('categories', sa.column('id', sa.Integer()), sa.column('slug', sa.String()), sa.column('name', sa.String()))
+
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(jobs, employers.c.name.label('employer_name'), categories.c.slug.label('category_slug'), categories.c.name.label('category_name'))
+        .select_from(jobs.join(employers, employers.c.id == jobs.c.employer_id).outerjoin(categories, categories.c.id == jobs.c.category_id))
+        .where(jobs.c.status == 'published', jobs.c.published_at.isnot(None))
+        .order_by(jobs.c.id)
+    ).all()
+    # Same strings as app.listings.format_salary and format_published_date. Jobs
+    # without a stored excerpt get one from scripts/backfill_description_html.py,
+    # which refreshes their listing rows as it saves them.
+    values = [
+        {
+            'id': row.id,
+            'title': row.title,
+            'employer_id': row.employer_id,
+            'employer_name': row.employer_name,
+            'category_id': row.category_id,
+            'category_slug': row.category_slug,
+            'category_name': row.category_name,
+            'tags': row.tags,
+            'excerpt_html': row.excerpt_html,
+            'salary': (
+                f"${row.salary_min:,} - ${row.salary_max:,} {row.salary_currency or ''}".rstrip()
+                if row.salary_min and row.salary_max else None
+            ),
+            'published_at': row.published_at,
+            'published_date': row.published_at.strftime('%b %d, %Y'),
+            'updated_at': row.updated_at,
+        }
+        for row in rows
+    ]
+    for start in range(0, len(values), BATCH_SIZE):
+        op.bulk_insert(job_listings, values[start:start + BATCH_SIZE])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_listings_category_id', table_name='job_listings')
+    op.drop_index('ix_job_listings_employer_id', table_name='job_listings')
+    op.drop_index('ix_job_listings_category_slug_published_at_id', table_name='job_listings')
+    op.drop_index('ix_job_listings_published_at_id', table_name='job_listings')
+    op.drop_table('job_listings')
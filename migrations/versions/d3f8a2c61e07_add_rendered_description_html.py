@@ -0,0 +1,34 @@
+"""Add stored description and excerpt HTML to jobs
+
+Existing rows are left NULL and rendered live until backfilled with
+scripts/backfill_description_html.py.
+
+Revision ID: d3f8a2c61e07
+Revises: b7d24e91c3a5
+Create Date: 2026-10-16 13:41:08.915362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8a2c61e07'
+down_revision: Union[str, Sequence[str], None] = 'b7d24e91c3a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('jobs', sa.Column('description_html', sa.Text(), nullable=True))
+    op.add_column('jobs', sa.Column('excerpt_html', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_column('excerpt_html')
+        batch_op.drop_column('description_html')
@@ -0,0 +1,40 @@
+"""Add updated_at to employers and categories for conditional GET validators
+
+Job pages and listings show employer and category names, so their validators
+need to change when those are renamed. Existing rows are backfilled from
+created_at.
+
+Revision ID: e4a9d7c2b813
+Revises: c2b7e4d19f56
+Create Date: 2026-10-17 04:12:37.905114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9d7c2b813'
+down_revision: Union[str, Sequence[str], None] = 'c2b7e4d19f56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('employers', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('categories', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE employers SET updated_at = created_at")
+    op.execute("UPDATE categories SET updated_at = created_at")
+    op.create_index('ix_job_listings_updated_at', 'job_listings', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_listings_updated_at', table_name='job_listings')
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('updated_at')
+    with op.batch_alter_table('employers') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,42 @@
+"""Add scheduler_leases for the background expiry sweeper
+
+Published jobs whose expiry has already passed are marked expired here, so
+listings can filter on status alone from the start.
+
+Revision ID: f5c9e2a7b318
+Revises: 8e41c7b0d29a
+Create Date: 2026-10-17 00:41:08.512630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c9e2a7b318'
+down_revision: Union[str, Sequence[str], None] = '8e41c7b0d29a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scheduler_leases',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('holder', sa.String(length=255), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.execute(
+        "UPDATE jobs SET status = 'expired', updated_at = CURRENT_TIMESTAMP "
+        "WHERE status = 'published' AND expires_at <= CURRENT_TIMESTAMP"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE jobs SET status = 'published' WHERE status = 'expired' AND expires_at <= CURRENT_TIMESTAMP")
+    op.drop_table('scheduler_leases')
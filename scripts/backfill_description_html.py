@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Render stored description HTML for existing jobs.
+Run with: python scripts/backfill_description_html.py [--all] [--batch-size N]
+"""
+
+import argparse
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.maintenance import backfill_description_html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--all", action="store_true", help="re-render every job, not only missing ones")
+    parser.add_argument("--batch-size", type=int, default=500, help="jobs rendered per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rendered = backfill_description_html(db, batch_size=args.batch_size, force=args.all)
+        print(f"✅ Rendered description HTML for {rendered} jobs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for concurrent requests against a running server.
+Run with: python scripts/benchmark_concurrency.py [--url URL] [--path PATH] [--concurrency N] [--requests N]
+
+Fires --requests GETs at --path with --concurrency in flight, while a probe
+repeatedly hits an endpoint that does no database work. If database queries
+block the event loop, throughput stays flat as concurrency rises and the probe
+latency climbs with the load; when they run in the threadpool, the probe stays
+fast. Start the server with the response cache disabled so every request
+reaches the database:
+
+    RESPONSE_CACHE_BACKEND=none uvicorn app.main:app --workers 1
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+PROBE_PATH = "/.well-known/appspecific/com.chrome.devtools.json"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int, total: int) -> list[float]:
+    """Issue `total` requests with `concurrency` in flight; return their latencies"""
+    latencies = []
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+
+async def run_probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Time a no-database request over and over until the load finishes"""
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(PROBE_PATH)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def benchmark(url: str, path: str, concurrency: int, total: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        await client.get(path)  # warm up templates and connections
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(run_probe(client, stop))
+        start = time.perf_counter()
+        latencies = await run_load(client, path, concurrency, total)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        probe_latencies = await probe
+
+    print(f"{path} x{total} at concurrency {concurrency}")
+    print(f"  throughput      {total / elapsed:8.1f} req/s")
+    print(f"  latency p50     {statistics.median(latencies) * 1000:8.1f} ms")
+    print(f"  latency p95     {percentile(latencies, 95) * 1000:8.1f} ms")
+    print(f"  probe p50       {statistics.median(probe_latencies) * 1000:8.1f} ms")
+    print(f"  probe p95       {percentile(probe_latencies, 95) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the running server")
+    parser.add_argument("--path", default="/", help="database-bound page to load")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight")
+    parser.add_argument("--requests", type=int, default=500, help="total requests")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.url, args.path, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write benchmark for the SQLite connection profile.
+Run with: python scripts/benchmark_sqlite.py [--jobs N] [--readers N] [--writers N] [--seconds S]
+
+Seeds a throwaway database file, then runs reader threads loading the first
+page of active jobs (as the home page does) alongside writer threads editing
+jobs and committing (as admin edits and webhooks do). It runs once with
+SQLite's defaults (rollback journal, synchronous=FULL) and once with the
+production profile from app.database, and prints throughput, read latency and
+"database is locked" errors for each.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.database import Base, build_engine
+from app.models import Job, JobListing, Employer, Category
+from app.queries import job_listings_query
+
+PROFILES = {
+    "defaults": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "production": None,  # app.database.sqlite_pragmas()
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def seed(engine, jobs: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    with Session(bind=engine) as db:
+        employer = Employer(name="Benchmark Co")
+        category = Category(name="Engineering", slug="engineering")
+        db.add_all([employer, category])
+        db.flush()
+        db.add_all([
+            Job(
+                title=f"Engineer {i}",
+                description="Build things. " * 40,
+                tags="python,sql",
+                apply_url="https://example.com/apply",
+                employer_id=employer.id,
+                category_id=category.id,
+                status="published",
+                published_at=now - timedelta(minutes=i),
+                expires_at=now + timedelta(days=30),
+            )
+            for i in range(jobs)
+        ])
+        db.commit()
+
+
+def run(engine, jobs: int, readers: int, writers: int, seconds: float) -> dict:
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_latencies, write_count, errors = [], [0], [0]
+
+    def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session(bind=engine) as db:
+                    job_listings_query(db).order_by(JobListing.published_at.desc(), JobListing.id.desc()).limit(20).all()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                read_latencies.append(time.perf_counter() - start)
+
+    def writer(offset: int):
+        i = offset
+        while not stop.is_set():
+            try:
+                with Session(bind=engine) as db:
+                    job = db.get(Job, i % jobs + 1)
+                    job.title = f"Engineer {i} (edited)"
+                    db.commit()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                write_count[0] += 1
+            i += writers
+            time.sleep(0.005)
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "reads": len(read_latencies) / seconds,
+        "writes": write_count[0] / seconds,
+        "p50": statistics.median(read_latencies) * 1000 if read_latencies else float("nan"),
+        "p95": percentile(read_latencies, 95) * 1000 if read_latencies else float("nan"),
+        "errors": errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=5000, help="published jobs to seed")
+    parser.add_argument("--readers", type=int, default=8, help="reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="writer threads")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    args = parser.parse_args()
+
+    print(f"{args.jobs} jobs, {args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile")
+    print(f"{'profile':<12}{'reads/s':>10}{'writes/s':>10}{'read p50':>12}{'read p95':>12}{'locked':>8}")
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", pragmas=pragmas)
+            seed(engine, args.jobs)
+            result = run(engine, args.jobs, args.readers, args.writers, args.seconds)
+            engine.dispose()
+        print(
+            f"{name:<12}{result['reads']:>10.1f}{result['writes']:>10.1f}"
+            f"{result['p50']:>9.1f} ms{result['p95']:>9.1f} ms{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Print a bcrypt hash to use as ADMIN_PASSWORD_HASH, so the plaintext admin
+password does not need to live in the environment.
+Run with: python scripts/hash_admin_password.py
+"""
+
+import getpass
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth import get_password_hash
+
+
+def main():
+    password = getpass.getpass("Admin password: ")
+    if password != getpass.getpass("Repeat password: "):
+        print("❌ Passwords do not match")
+        sys.exit(1)
+    print(f"ADMIN_PASSWORD_HASH={get_password_hash(password)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Rebuild the job_listings read model from the jobs table.
+Run with: python scripts/rebuild_job_listings.py
+
+Only needed after jobs, employers or categories were changed outside the
+application, e.g. with hand-written SQL; the app keeps the table in step itself.
+"""
+
+import argparse
+import sys
+import os
+
+# Add the parent directory to the path so we can import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import engine
+from app.listings import rebuild_job_listings
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+
+    with engine.begin() as connection:
+        listed = rebuild_job_listings(connection)
+    print(f"✅ Listed {listed} active jobs")
+
+
+if __name__ == "__main__":
+    main()
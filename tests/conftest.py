@@ -2,16 +2,20 @@ import pytest
 import asyncio
 from typing import Generator, AsyncGenerator
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from datetime import datetime, timezone, timedelta
 
 from app.main import app
+from app import cache as response_cache
+from app.sitemap import shard_cache
+from app.search import clear_fts_cache
 from app.database import get_db, Base
 from app.models import Job, Employer, Category, EmployerAccount
-from app.auth import get_password_hash, serializer
+from app.auth import get_password_hash, serializer, CSRF_COOKIE
 from app.config import settings
+from app.query_stats import instrument_engine
 
 
 def get_test_csrf_token():
@@ -27,6 +31,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -42,6 +47,9 @@ def override_get_db():
 # Override the database dependency
 app.dependency_overrides[get_db] = override_get_db
 
+# The scheduler would sweep the real database; tests run its tasks directly
+settings.scheduler_enabled = False
+
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -67,10 +75,40 @@ def db() -> Generator[Session, None, None]:
         Base.metadata.drop_all(bind=engine)
 
 
+class QueryCounter:
+    """Count SQL statements executed on the test engine while active"""
+    
+    def __init__(self):
+        self.statements = []
+    
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._record)
+        return self
+    
+    def __exit__(self, *exc_info):
+        event.remove(engine, "before_cursor_execute", self._record)
+
+
+@pytest.fixture
+def query_counter() -> QueryCounter:
+    """Context manager counting SQL statements sent to the test database"""
+    return QueryCounter()
+
+
 @pytest.fixture
 def client(db: Session) -> Generator[TestClient, None, None]:
     """Create a test client with database session"""
     with TestClient(app, follow_redirects=False) as test_client:
+        # Double-submit cookie matching the tokens tests put in their forms
+        test_client.cookies.set(CSRF_COOKIE, get_test_csrf_token())
         yield test_client
 
 
@@ -197,6 +235,40 @@ def draft_job(db: Session, employer: Employer, category: Category) -> Job:
     return job
 
 
+@pytest.fixture
+def make_job(db: Session, employer: Employer, category: Category):
+    """Factory for published test jobs; keyword arguments override any Job field"""
+    def _make_job(**kwargs) -> Job:
+        data = {
+            "title": "Test Role",
+            "description": "A test job description.",
+            "tags": "general",
+            "apply_url": "https://example.com/apply",
+            "employer": employer,
+            "category": category,
+            "status": "published",
+            "published_at": datetime.now(timezone.utc),
+        }
+        data.update(kwargs)
+        job = Job(**data)
+        db.add(job)
+        db.commit()
+        return job
+    return _make_job
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Keep cached pages, sitemap shards and the FTS check from leaking between tests"""
+    response_cache.clear()
+    shard_cache.clear()
+    clear_fts_cache()
+    yield
+    response_cache.clear()
+    shard_cache.clear()
+    clear_fts_cache()
+
+
 # Mock CSRF token for testing
 @pytest.fixture(autouse=True)
 def mock_csrf_token(monkeypatch):
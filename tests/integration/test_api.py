@@ -1,3 +1,4 @@
+import gzip
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
@@ -58,11 +59,15 @@ class TestPublicRoutes:
         assert data[0]["title"] == published_job.title
     
     def test_sitemap_xml(self, client: TestClient, published_job: Job):
-        """Test sitemap XML generation"""
+        """Test sitemap index and job shard generation"""
         response = client.get("/sitemap.xml")
         assert response.status_code == 200
         assert "application/xml" in response.headers["content-type"]
-        assert f"/jobs/{published_job.id}" in response.text
+        assert "/sitemaps/jobs-1.xml.gz" in response.text
+        
+        shard = client.get("/sitemaps/jobs-1.xml.gz")
+        assert shard.status_code == 200
+        assert f"/jobs/{published_job.id}</loc>" in gzip.decompress(shard.content).decode()
 
 
 class TestEmployerRoutes:
@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.archive import archive_jobs
+from app.models import Job, JobArchive, job_tags
+
+
+@pytest.fixture
+def make_old_job(db: Session, make_job):
+    """Factory for expired jobs last changed `age` ago"""
+    def _make_old_job(age: timedelta = timedelta(days=60), **kwargs) -> Job:
+        job = make_job(**{"status": "expired", **kwargs})
+        db.execute(update(Job).where(Job.id == job.id).values(updated_at=datetime.now(timezone.utc) - age))
+        db.commit()
+        return job
+    return _make_old_job
+
+
+class TestArchiveJobs:
+    """Test moving old jobs to jobs_archive"""
+
+    def test_moves_old_finished_jobs(self, db: Session, make_old_job):
+        expired_id = make_old_job(status="expired").id
+        refunded_id = make_old_job(status="refunded", refund_reason="Changed plans").id
+        draft_id = make_old_job(status="draft").id
+        make_old_job(age=timedelta(0), status="published")
+
+        assert archive_jobs(db) == 3
+
+        ids = {expired_id, refunded_id, draft_id}
+        assert db.query(Job).filter(Job.id.in_(ids)).count() == 0
+        archived = {row.id: row for row in db.query(JobArchive).filter(JobArchive.id.in_(ids))}
+        assert set(archived) == ids
+        assert archived[refunded_id].refund_reason == "Changed plans"
+        assert archived[expired_id].title == "Test Role"
+        assert archived[expired_id].archived_at is not None
+
+    def test_keeps_recent_and_published_jobs(self, db: Session, make_old_job):
+        recent = make_old_job(age=timedelta(days=5))
+        published = make_old_job(status="published", expires_at=datetime.now(timezone.utc) + timedelta(days=5))
+        make_old_job(age=timedelta(0), status="published")
+
+        assert archive_jobs(db) == 0
+        assert db.get(Job, recent.id) is not None
+        assert db.get(Job, published.id) is not None
+
+    def test_never_archives_the_newest_job(self, db: Session, make_old_job):
+        job = make_old_job()
+
+        assert archive_jobs(db) == 0
+        assert db.get(Job, job.id) is not None
+
+    def test_removes_tag_links(self, db: Session, make_old_job):
+        job_id = make_old_job().id
+        make_old_job(age=timedelta(0), status="published")
+
+        archive_jobs(db)
+
+        assert db.execute(job_tags.select().where(job_tags.c.job_id == job_id)).all() == []
+
+    def test_works_in_batches(self, db: Session, make_old_job):
+        for _ in range(5):
+            make_old_job()
+        make_old_job(age=timedelta(0), status="published")
+
+        assert archive_jobs(db, batch_size=2) == 5
+        assert db.query(JobArchive).count() == 5
+
+    def test_archived_jobs_leave_the_admin_dashboard(self, client: TestClient, admin_session: dict, db: Session, make_old_job):
+        make_old_job(title="Long Gone Engineer")
+        make_old_job(age=timedelta(0), status="published")
+        archive_jobs(db)
+
+        response = client.get("/admin", cookies=admin_session)
+        assert response.status_code == 200
+        assert "Long Gone Engineer" not in response.text
+
+
+class TestArchivedJobPage:
+    """Old links to archived jobs"""
+
+    def test_archived_job_is_gone(self, client: TestClient, db: Session, make_old_job):
+        job_id = make_old_job(title="Long Gone Engineer").id
+        make_old_job(age=timedelta(0), status="published")
+        archive_jobs(db)
+
+        response = client.get(f"/jobs/{job_id}")
+        assert response.status_code == 410
+        assert "no longer available" in response.text
+        assert "Long Gone Engineer" in response.text
+        assert 'name="robots" content="noindex"' in response.text
+
+    def test_unknown_job_is_not_found(self, client: TestClient):
+        assert client.get("/jobs/999999").status_code == 404
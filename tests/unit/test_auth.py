@@ -1,4 +1,7 @@
 import pytest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from unittest.mock import patch
 from app.auth import (
@@ -11,8 +14,19 @@ from app.auth import (
     clear_admin_session,
     create_employer_session,
     verify_employer_session,
-    clear_employer_session
+    clear_employer_session,
+    hashing_pool,
+    pwd_context,
+    serializer,
+    verify_csrf_request,
+    LazyCsrfToken,
+    CSRF_COOKIE,
+    Principal,
+    get_principal,
+    reset_admin_credentials
 )
+from fastapi import Response
+from app.hashing import HashingPool, HashingPoolFull
 from app.config import settings
 
 
@@ -53,6 +67,55 @@ class TestPasswordHashing:
         assert verify_password("wrong", password_hash) is False
 
 
+class TestHashingPool:
+    """Test the bounded bcrypt worker pool"""
+    
+    def test_run_returns_result(self):
+        pool = HashingPool(workers=1, max_queue=0)
+        assert pool.run(lambda a, b: a + b, 2, 3) == 5
+        assert pool.stats()["in_flight"] == 0
+    
+    def test_full_pool_rejects_and_reports_queue_depth(self):
+        """Calls beyond workers + max_queue fail fast instead of waiting"""
+        depths = []
+        pool = HashingPool(workers=1, max_queue=1, on_queue_depth=depths.append)
+        release = threading.Event()
+        started = threading.Event()
+        
+        def blocking():
+            started.set()
+            release.wait(5)
+        
+        with ThreadPoolExecutor(max_workers=2) as callers:
+            running = callers.submit(pool.run, blocking)
+            started.wait(5)
+            queued = callers.submit(pool.run, lambda: None)
+            while pool.stats()["in_flight"] < 2:
+                time.sleep(0.01)
+            
+            assert pool.queue_depth == 1
+            with pytest.raises(HashingPoolFull):
+                pool.run(lambda: None)
+            
+            release.set()
+            running.result(5)
+            queued.result(5)
+        
+        assert pool.stats() == {"workers": 1, "max_queue": 1, "in_flight": 0, "queue_depth": 0, "rejected": 1}
+        assert depths[-1] == 0 and 1 in depths
+    
+    def test_saturated_pool_answers_503(self, client, employer_account, monkeypatch):
+        """A login burst gets 503 rather than stalling other routes"""
+        def full(*args):
+            raise HashingPoolFull()
+        
+        monkeypatch.setattr(hashing_pool, "run", full)
+        response = client.post("/employer/login", data={"email": employer_account.email, "password": "x"})
+        
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+
 class TestCSRFToken:
     """Test CSRF token generation and verification"""
     
@@ -80,6 +143,124 @@ class TestCSRFToken:
         assert verify_csrf_token(None) is False
 
 
+class TestDoubleSubmitCsrf:
+    """Test the per-session, lazily generated CSRF token"""
+    
+    class MockRequest:
+        def __init__(self, cookies=None):
+            self.cookies = cookies or {}
+    
+    def test_token_must_match_cookie(self):
+        token = generate_csrf_token()
+        
+        assert verify_csrf_request(self.MockRequest({CSRF_COOKIE: token}), token) is True
+        assert verify_csrf_request(self.MockRequest({CSRF_COOKIE: token}), generate_csrf_token()) is False
+        assert verify_csrf_request(self.MockRequest(), token) is False
+        assert verify_csrf_request(self.MockRequest({CSRF_COOKIE: token}), None) is False
+    
+    def test_resigned_token_with_same_value_matches(self):
+        """The signed values are compared, not the raw strings"""
+        assert verify_csrf_request(self.MockRequest({CSRF_COOKIE: serializer.dumps("abc")}), serializer.dumps("abc")) is True
+    
+    def test_lazy_token_is_not_generated_until_read(self):
+        with patch("app.auth.generate_csrf_token", wraps=generate_csrf_token) as generate:
+            token = LazyCsrfToken(None)
+            assert generate.call_count == 0
+            
+            value = str(token)
+            assert str(token) == value
+        
+        assert generate.call_count == 1
+        assert token.is_new is True
+    
+    def test_lazy_token_reuses_valid_cookie(self):
+        cookie_token = generate_csrf_token()
+        token = LazyCsrfToken(cookie_token)
+        
+        assert str(token) == cookie_token
+        assert token.is_new is False
+        assert str(LazyCsrfToken("forged")) != "forged"
+    
+    def test_pages_without_forms_do_not_sign_tokens(self, client, published_job):
+        client.cookies.delete(CSRF_COOKIE)
+        with patch("app.auth.generate_csrf_token") as generate:
+            for path in ["/", "/jobs/feed.json", "/sitemap.xml", f"/jobs/{published_job.id}"]:
+                response = client.get(path)
+                assert CSRF_COOKIE not in response.cookies
+        
+        assert generate.call_count == 0
+    
+    def test_form_page_sets_cookie_once_per_session(self, client):
+        client.cookies.delete(CSRF_COOKIE)
+        
+        first = client.get("/employer/register")
+        token = first.cookies[CSRF_COOKIE]
+        client.cookies.set(CSRF_COOKIE, token)
+        second = client.get("/employer/register")
+        
+        assert f'value="{token}"' in first.text
+        assert f'value="{token}"' in second.text
+        assert CSRF_COOKIE not in second.cookies
+    
+    def test_token_from_another_session_is_rejected(self, client):
+        response = client.post("/employer/register", data={
+            "email": "new@company.com",
+            "password": "securepassword123",
+            "company_name": "New Company",
+            "contact_name": "Jane Doe",
+            "csrf_token": generate_csrf_token(),
+        })
+        
+        assert response.status_code == 400
+
+
+class TestPrincipal:
+    """Test per-request decoding of the session cookies"""
+    
+    def test_requests_without_session_cookies_skip_verification(self, client, published_job):
+        with patch("app.auth.verify_admin_session") as verify_admin, \
+                patch("app.auth.verify_employer_session") as verify_employer:
+            assert client.get("/").status_code == 200
+            assert client.get(f"/jobs/{published_job.id}").status_code == 200
+        
+        assert verify_admin.call_count == 0
+        assert verify_employer.call_count == 0
+    
+    def test_each_cookie_is_decoded_once_per_request(self, client, admin_session):
+        """The middleware and the handler share one decoded principal"""
+        with patch("app.auth.verify_admin_session", wraps=verify_admin_session) as verify_admin:
+            response = client.get("/admin", cookies=admin_session)
+        
+        assert response.status_code == 200
+        assert verify_admin.call_count == 1
+    
+    def test_principal_for_employer_cookie(self, employer_account):
+        response = Response()
+        create_employer_session(response, employer_account.id)
+        cookie = response.headers["set-cookie"].split(";")[0].split("=", 1)[1]
+        
+        class MockState:
+            pass
+        
+        class MockRequest:
+            cookies = {"employer_session": cookie}
+            state = MockState()
+        
+        request = MockRequest()
+        principal = get_principal(request)
+        
+        assert principal == Principal(is_admin=False, employer_account_id=employer_account.id)
+        assert principal.is_employer is True
+        assert request.state.principal is principal
+    
+    def test_invalid_cookie_gives_anonymous_principal(self, client):
+        client.cookies.set("admin_session", "invalid_token")
+        
+        response = client.get("/admin")
+        
+        assert response.status_code == 302
+
+
 class TestSessionManagement:
     """Test session creation, verification, and clearing"""
     
@@ -282,6 +463,13 @@ class TestSecurityFeatures:
 class TestAdminAuthentication:
     """Test admin authentication functions"""
     
+    @pytest.fixture(autouse=True)
+    def fresh_admin_credentials(self):
+        """Rebuild the credential store from each test's settings"""
+        reset_admin_credentials()
+        yield
+        reset_admin_credentials()
+    
     def test_authenticate_admin_plain_success(self):
         """Test successful admin authentication with plain text"""
         from app.auth import authenticate_admin_plain
@@ -290,6 +478,7 @@ class TestAdminAuthentication:
         with patch('app.auth.settings') as mock_settings:
             mock_settings.admin_username = "admin"
             mock_settings.admin_password = "password123"
+            mock_settings.admin_password_hash = None
             
             result = authenticate_admin_plain("admin", "password123")
             assert result is True
@@ -302,6 +491,7 @@ class TestAdminAuthentication:
         with patch('app.auth.settings') as mock_settings:
             mock_settings.admin_username = "admin"
             mock_settings.admin_password = "password123"
+            mock_settings.admin_password_hash = None
             
             result = authenticate_admin_plain("admin", "wrongpassword")
             assert result is False
@@ -314,10 +504,81 @@ class TestAdminAuthentication:
         with patch('app.auth.settings') as mock_settings:
             mock_settings.admin_username = "admin"
             mock_settings.admin_password = "password123"
+            mock_settings.admin_password_hash = None
             
             result = authenticate_admin_plain("wronguser", "password123")
             assert result is False
 
+    
+    def test_admin_password_is_hashed_once(self):
+        """Repeated admin checks reuse one hash and cost one verification each"""
+        from app.auth import AdminCredentials
+        
+        credentials = AdminCredentials("admin", password="password123")
+        with patch("app.auth.get_password_hash", wraps=get_password_hash) as hash_calls, \
+                patch("app.auth.pwd_context.verify_and_update", wraps=pwd_context.verify_and_update) as verify_calls:
+            assert credentials.verify("admin", "password123") is True
+            assert credentials.verify("admin", "wrongpassword") is False
+            assert credentials.verify("admin", "password123") is True
+        
+        assert hash_calls.call_count == 1
+        assert verify_calls.call_count == 3
+
+    def test_admin_password_is_hashed_at_startup(self):
+        """The first login after startup pays for one verification, not a hash as well"""
+        from app.auth import admin_credentials, prepare_admin_credentials
+
+        with patch("app.auth.settings") as mock_settings:
+            mock_settings.admin_username = "admin"
+            mock_settings.admin_password = "startup-secret"
+            mock_settings.admin_password_hash = None
+            prepare_admin_credentials()
+            assert admin_credentials()._password is None
+
+            with patch("app.auth.get_password_hash") as hash_calls:
+                assert admin_credentials().verify("admin", "startup-secret") is True
+            assert hash_calls.call_count == 0
+
+    def test_configured_hash_is_used_without_plaintext(self):
+        from app.auth import AdminCredentials
+        
+        credentials = AdminCredentials("admin", password_hash=get_password_hash("s3cret"))
+        
+        assert credentials.verify("admin", "s3cret") is True
+        assert credentials.verify("root", "s3cret") is False
+    
+    def test_admin_password_hash_setting_takes_precedence(self):
+        from app.auth import authenticate_admin_plain
+        
+        with patch('app.auth.settings') as mock_settings:
+            mock_settings.admin_username = "admin"
+            mock_settings.admin_password = "changeme"
+            mock_settings.admin_password_hash = get_password_hash("from-hash")
+            
+            assert authenticate_admin_plain("admin", "from-hash") is True
+            assert authenticate_admin_plain("admin", "changeme") is False
+    
+    def test_outdated_cost_is_rehashed(self):
+        """A hash made with fewer bcrypt rounds is upgraded after a successful check"""
+        from app.auth import AdminCredentials
+        
+        weak_hash = pwd_context.hash("password123", rounds=4)
+        credentials = AdminCredentials("admin", password_hash=weak_hash)
+        
+        assert credentials.verify("admin", "password123") is True
+        assert credentials.password_hash != weak_hash
+        assert f"${settings.bcrypt_rounds:02d}$" in credentials.password_hash
+        assert credentials.verify("admin", "password123") is True
+    
+    def test_employer_login_upgrades_outdated_hash(self, client, db, employer_account):
+        employer_account.password_hash = pwd_context.hash("testpassword", rounds=4)
+        db.commit()
+        
+        client.post("/employer/login", data={"email": employer_account.email, "password": "testpassword"})
+        db.refresh(employer_account)
+        
+        assert f"${settings.bcrypt_rounds:02d}$" in employer_account.password_hash
+
 
 class TestCSRFTokenExtraction:
     """Test CSRF token extraction from requests"""
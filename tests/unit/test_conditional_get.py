@@ -0,0 +1,174 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime
+from fastapi.testclient import TestClient
+from app.conditional import Validators, active_jobs_validators, etag_matches, is_not_modified, make_validators
+from app.config import settings
+from app.models import Job, Employer, Category
+
+
+PUBLIC_LISTINGS = ["/", "/jobs/feed.json", "/sitemap.xml"]
+
+
+class TestValidatorHelpers:
+    """Test ETag comparison and precondition evaluation"""
+
+    def test_etag_is_strong_and_quoted(self):
+        validators = make_validators("feed", 3, 42)
+        assert validators.etag.startswith('"') and validators.etag.endswith('"')
+        assert validators.etag == make_validators("feed", 3, 42).etag
+        assert validators.etag != make_validators("feed", 3, 43).etag
+
+    def test_etag_matches_lists_weak_tags_and_wildcard(self):
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+
+    def test_if_none_match_takes_precedence(self):
+        last_modified = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        validators = Validators(etag='"current"', last_modified=last_modified)
+        headers = {
+            "if-none-match": '"stale"',
+            "if-modified-since": format_datetime(last_modified + timedelta(days=1), usegmt=True),
+        }
+        assert not is_not_modified(headers, validators)
+
+    def test_if_modified_since_compares_whole_seconds(self):
+        validators = make_validators("x", last_modified=datetime(2026, 1, 1, 12, 0, 0, 500000, tzinfo=timezone.utc))
+        assert is_not_modified({"if-modified-since": "Thu, 01 Jan 2026 12:00:00 GMT"}, validators)
+        assert not is_not_modified({"if-modified-since": "Thu, 01 Jan 2026 11:59:59 GMT"}, validators)
+
+    def test_malformed_if_modified_since_is_ignored(self):
+        validators = make_validators("x", last_modified=datetime(2026, 1, 1, tzinfo=timezone.utc))
+        assert not is_not_modified({"if-modified-since": "yesterday"}, validators)
+
+
+class TestConditionalGet:
+    """Test 304 handling on the public pages and feed"""
+
+    @pytest.fixture(autouse=True)
+    def disable_response_cache(self, monkeypatch):
+        """Exercise the route handlers rather than stored responses"""
+        monkeypatch.setattr("app.cache.backend", None)
+
+    @pytest.mark.parametrize("path", PUBLIC_LISTINGS)
+    def test_responses_carry_validators(self, client: TestClient, published_job: Job, path: str):
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["last-modified"].endswith("GMT")
+
+    @pytest.mark.parametrize("path", PUBLIC_LISTINGS + ["/jobs/{id}"])
+    def test_matching_etag_returns_304(self, client: TestClient, published_job: Job, path: str):
+        path = path.format(id=published_job.id)
+        etag = client.get(path).headers["etag"]
+
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    @pytest.mark.parametrize("path", PUBLIC_LISTINGS)
+    def test_if_modified_since_returns_304(self, client: TestClient, published_job: Job, path: str):
+        last_modified = client.get(path).headers["last-modified"]
+
+        response = client.get(path, headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize("path", PUBLIC_LISTINGS)
+    def test_304_costs_one_query(self, client: TestClient, make_job, query_counter, path: str):
+        """Every anonymous poll pays for the validators, so they are one indexed statement"""
+        for i in range(5):
+            make_job(title=f"Engineer {i}")
+        etag = client.get(path).headers["etag"]
+
+        with query_counter:
+            response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert query_counter.count == 1
+
+    def test_304_skips_rendering(self, client: TestClient, published_job: Job, monkeypatch):
+        etag = client.get("/").headers["etag"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("template rendered for a 304")
+
+        monkeypatch.setattr("app.main.templates.TemplateResponse", fail)
+        assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_job_edit_changes_validators(self, client: TestClient, db, published_job: Job):
+        etag = client.get("/jobs/feed.json").headers["etag"]
+        published_job.title = "Retitled Engineer"
+        db.commit()
+
+        response = client.get("/jobs/feed.json", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    def test_expiry_changes_listing_etag(self, client: TestClient, db, published_job: Job):
+        """A job dropping off the listing with no edit still changes the ETag"""
+        published_job.expires_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+        db.commit()
+        etag = client.get("/").headers["etag"]
+
+        published_job.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db.commit()
+
+        assert client.get("/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_refund_window_closing_changes_feed_etag(self, db, published_job: Job):
+        """can_refund flips with time alone, without any write to the job"""
+        closes_at = published_job.published_at + timedelta(hours=settings.refund_window_hours)
+
+        before = active_jobs_validators(db, "feed", now=closes_at - timedelta(minutes=1))
+        after = active_jobs_validators(db, "feed", now=closes_at + timedelta(minutes=1))
+
+        assert before.etag != after.etag
+
+    @pytest.mark.parametrize("path", PUBLIC_LISTINGS + ["/jobs/{id}"])
+    def test_employer_rename_changes_etag(self, client: TestClient, db, published_job: Job, employer: Employer, path: str):
+        """Employer names are shown on every job page and listing without editing the job"""
+        path = path.format(id=published_job.id)
+        etag = client.get(path).headers["etag"]
+        employer.name = "Renamed Company"
+        db.commit()
+
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+
+    @pytest.mark.parametrize("path", ["/", "/jobs/{id}"])
+    def test_category_rename_changes_etag(self, client: TestClient, db, published_job: Job, category: Category, path: str):
+        path = path.format(id=published_job.id)
+        etag = client.get(path).headers["etag"]
+        category.name = "Engineering"
+        db.commit()
+
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+    def test_signed_in_pages_get_no_validators(self, client: TestClient, admin_session, published_job: Job):
+        response = client.get("/", cookies=admin_session)
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+
+class TestConditionalGetFromCache:
+    """Cached responses answer revalidation without calling the app"""
+
+    def test_cache_hit_returns_304(self, client: TestClient, published_job: Job, query_counter):
+        etag = client.get("/jobs/feed.json").headers["etag"]
+
+        with query_counter:
+            response = client.get("/jobs/feed.json", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.headers["x-cache"] == "HIT"
+        assert query_counter.count == 0
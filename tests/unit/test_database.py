@@ -1,7 +1,20 @@
+import inspect
+import threading
 import pytest
-from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import text
-from app.database import get_db, SessionLocal
+from app import database
+from app.config import settings
+from app.database import (
+    READ_PRIMARY_COOKIE, Base, RoutingSession, build_engine, get_db, read_engine_url, SessionLocal, stick_to_primary,
+)
+from app.main import app
+from app.models import Category
 
 
 class TestDatabaseConnection:
@@ -58,4 +71,169 @@ class TestDatabaseConnection:
             assert connection is not None
             # Test a simple query using proper SQLAlchemy syntax
             result = connection.execute(text("SELECT 1"))
-            assert result is not None 
\ No newline at end of file
+            assert result is not None 
+
+class TestHandlersOffEventLoop:
+    """Database-bound routes must not run their blocking queries on the event loop"""
+
+    def test_routes_using_get_db_are_sync(self):
+        offenders = []
+        for route in app.routes:
+            if not isinstance(route, APIRoute):
+                continue
+            uses_db = any(dependency.call is get_db for dependency in route.dependant.dependencies)
+            if uses_db and inspect.iscoroutinefunction(route.endpoint):
+                offenders.append(route.path)
+
+        assert offenders == []
+
+    def test_concurrent_requests_overlap(self, client, published_job, monkeypatch):
+        """Two slow queries on different requests run at the same time in the threadpool"""
+        import app.main as main
+
+        barrier = threading.Barrier(2, timeout=5)
+        real_job_validators = main.job_validators
+
+        def waiting_job_validators(job):
+            barrier.wait()  # Only passes when both requests are inside a handler
+            return real_job_validators(job)
+
+        monkeypatch.setattr(main, "job_validators", waiting_job_validators)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            responses = list(pool.map(lambda _: client.get(f"/jobs/{published_job.id}"), range(2)))
+
+        assert [response.status_code for response in responses] == [200, 200]
+
+
+class TestSqliteProfile:
+    """File-backed SQLite engines get the production pragmas and a sized pool"""
+
+    def pragma(self, engine, name: str):
+        with engine.connect() as connection:
+            return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    def test_applies_pragmas_on_connect(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+        try:
+            assert self.pragma(engine, "journal_mode") == "wal"
+            assert self.pragma(engine, "synchronous") == 1  # NORMAL
+            assert self.pragma(engine, "busy_timeout") == settings.sqlite_busy_timeout_ms
+            assert self.pragma(engine, "cache_size") == settings.sqlite_cache_size
+            assert self.pragma(engine, "temp_store") == 2  # MEMORY
+        finally:
+            engine.dispose()
+
+    def test_uses_configured_pool(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        try:
+            assert engine.pool.size() == settings.db_pool_size
+        finally:
+            engine.dispose()
+
+    def test_custom_pragmas(self, tmp_path):
+        engine = build_engine(f"sqlite:///{tmp_path / 'custom.db'}", pragmas={"journal_mode": "DELETE"})
+        try:
+            assert self.pragma(engine, "journal_mode") == "delete"
+        finally:
+            engine.dispose()
+
+    def test_in_memory_databases_are_left_alone(self):
+        engine = build_engine("sqlite:///:memory:")
+        assert self.pragma(engine, "journal_mode") == "memory"
+
+
+class TestReadReplicaRouting:
+    """Reads can go to a read-only engine while writes stay on the primary"""
+
+    @pytest.fixture
+    def engines(self, tmp_path):
+        path = tmp_path / "primary.db"
+        primary = build_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=primary)
+        replica = build_engine(f"sqlite:///file:{path}?mode=ro&uri=true", pragmas={})
+        yield primary, replica
+        replica.dispose()
+        primary.dispose()
+
+    def make_session(self, engines, use_replica: bool) -> RoutingSession:
+        primary, replica = engines
+        return RoutingSession(bind=primary, replica=replica, use_replica=use_replica)
+
+    def test_reads_use_replica(self, engines):
+        with self.make_session(engines, use_replica=True) as db:
+            assert db.get_bind() is engines[1]
+
+    def test_sessions_not_marked_use_primary(self, engines):
+        with self.make_session(engines, use_replica=False) as db:
+            assert db.get_bind() is engines[0]
+
+    def test_writes_go_to_primary(self, engines):
+        with self.make_session(engines, use_replica=True) as db:
+            db.add(Category(name="Design", slug="design"))
+            db.commit()
+            assert db.query(Category).filter(Category.slug == "design").count() == 1
+            db.query(Category).filter(Category.slug == "design").update({"name": "UX"})
+            db.commit()
+            assert db.query(Category.name).scalar() == "UX"
+
+    def test_replica_is_read_only(self, engines):
+        with engines[1].connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql("DELETE FROM categories")
+
+    def test_read_engine_url_for_sqlite(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "database_read_url", None)
+        monkeypatch.setattr(settings, "sqlite_read_only_pool", True)
+        monkeypatch.setattr(settings, "database_url", "sqlite:///./board.db")
+        assert read_engine_url().endswith("board.db?mode=ro&uri=true")
+        monkeypatch.setattr(settings, "database_read_url", "postgresql://replica/board")
+        assert read_engine_url() == "postgresql://replica/board"
+        monkeypatch.setattr(settings, "database_read_url", None)
+        monkeypatch.setattr(settings, "sqlite_read_only_pool", False)
+        assert read_engine_url() is None
+
+
+class TestReadRoutingPerRequest:
+    """get_db picks the engine from the request method, with a read-your-writes override"""
+
+    @pytest.fixture
+    def routing_app(self, tmp_path, monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+        primary = build_engine(f"sqlite:///{tmp_path / 'routing.db'}")
+        Base.metadata.create_all(bind=primary)
+        monkeypatch.setattr(database, "SessionLocal", sessionmaker(class_=RoutingSession, bind=primary))
+        monkeypatch.setattr(database, "read_engine", object())
+        routing_app = FastAPI()
+
+        @routing_app.get("/")
+        @routing_app.post("/")
+        def endpoint(db: Session = Depends(get_db)):
+            return {"replica": db.use_replica}
+
+        @routing_app.post("/write")
+        def write(request: Request, db: Session = Depends(get_db)):
+            db.add(Category(name="Ops", slug="ops"))
+            db.flush()
+            db.rollback()
+            response = Response()
+            stick_to_primary(request, response)
+            return response
+
+        yield routing_app
+        primary.dispose()
+
+    def test_get_reads_from_replica(self, routing_app: FastAPI):
+        assert TestClient(routing_app).get("/").json() == {"replica": True}
+
+    def test_post_uses_primary(self, routing_app: FastAPI):
+        assert TestClient(routing_app).post("/").json() == {"replica": False}
+
+    def test_read_your_writes(self, routing_app: FastAPI):
+        client = TestClient(routing_app)
+        response = client.post("/write")
+        assert response.cookies.get(READ_PRIMARY_COOKIE) == "1"
+        assert client.get("/").json() == {"replica": False}
+
+    def test_no_cookie_without_a_read_engine(self, routing_app: FastAPI, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(database, "read_engine", None)
+        assert READ_PRIMARY_COOKIE not in TestClient(routing_app).post("/write").cookies
@@ -0,0 +1,137 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session, sessionmaker
+from app.expiry import expire_jobs
+from app.models import Job, SchedulerLease
+from app.scheduler import Scheduler, acquire_lease
+
+
+def lapse(db: Session, job: Job, ago: timedelta = timedelta(minutes=1)) -> None:
+    """Move a job's expiry into the past behind the ORM's back, as time passing would"""
+    db.execute(update(Job).where(Job.id == job.id).values(expires_at=datetime.now(timezone.utc) - ago))
+    db.commit()
+
+
+class TestExpireJobs:
+    """Test the expiry sweep"""
+
+    def test_expires_only_lapsed_published_jobs(self, db: Session, make_job, draft_job: Job):
+        lapsed = make_job()
+        active = make_job()
+        lapse(db, lapsed)
+
+        assert expire_jobs(db) == 1
+
+        db.expire_all()
+        assert lapsed.status == "expired"
+        assert active.status == "published"
+        assert draft_job.status == "draft"
+
+    def test_bumps_updated_at(self, db: Session, make_job):
+        job = make_job()
+        lapse(db, job)
+        now = datetime.now(timezone.utc)
+
+        expire_jobs(db, now=now)
+
+        db.expire_all()
+        assert job.updated_at.replace(tzinfo=timezone.utc) == now
+
+    def test_works_in_batches(self, db: Session, make_job):
+        jobs = [make_job() for _ in range(5)]
+        for job in jobs:
+            lapse(db, job)
+
+        assert expire_jobs(db, batch_size=2) == 5
+        assert db.query(Job).filter(Job.status == "published").count() == 0
+
+    def test_expired_jobs_leave_the_listing(self, client: TestClient, db: Session, make_job):
+        job = make_job(title="Soon Gone Engineer")
+        lapse(db, job)
+        expire_jobs(db)
+
+        assert "Soon Gone Engineer" not in client.get("/").text
+
+
+class TestExpiryStatusOnWrite:
+    """Jobs saved through the ORM keep status and expiry consistent"""
+
+    def test_saving_a_lapsed_published_job_expires_it(self, make_job):
+        job = make_job(expires_at=datetime.now(timezone.utc) - timedelta(days=1))
+        assert job.status == "expired"
+
+    def test_extending_an_expired_job_relists_it(self, db: Session, make_job):
+        job = make_job()
+        lapse(db, job)
+        expire_jobs(db)
+        db.expire_all()
+
+        job.expires_at = datetime.now(timezone.utc) + timedelta(days=7)
+        db.commit()
+
+        assert job.status == "published"
+
+    def test_other_edits_leave_expired_jobs_alone(self, db: Session, make_job):
+        job = make_job(expires_at=datetime.now(timezone.utc) + timedelta(days=1), status="expired")
+        job.title = "Renamed"
+        db.commit()
+        assert job.status == "expired"
+
+
+class TestLease:
+    """Test the lease row that picks one worker per task"""
+
+    def test_first_holder_wins(self, db: Session):
+        assert acquire_lease(db, "sweep", "worker-a", ttl=60)
+        assert not acquire_lease(db, "sweep", "worker-b", ttl=60)
+
+    def test_holder_renews(self, db: Session):
+        now = datetime.now(timezone.utc)
+        assert acquire_lease(db, "sweep", "worker-a", ttl=60, now=now)
+        assert acquire_lease(db, "sweep", "worker-a", ttl=60, now=now + timedelta(seconds=30))
+        lease = db.get(SchedulerLease, "sweep")
+        assert lease.expires_at.replace(tzinfo=timezone.utc) == now + timedelta(seconds=90)
+
+    def test_expired_lease_is_taken_over(self, db: Session):
+        now = datetime.now(timezone.utc)
+        assert acquire_lease(db, "sweep", "worker-a", ttl=60, now=now)
+        assert acquire_lease(db, "sweep", "worker-b", ttl=60, now=now + timedelta(seconds=61))
+        assert db.get(SchedulerLease, "sweep").holder == "worker-b"
+
+    def test_leases_are_per_task(self, db: Session):
+        assert acquire_lease(db, "sweep", "worker-a", ttl=60)
+        assert acquire_lease(db, "archive", "worker-b", ttl=60)
+
+
+class TestScheduler:
+    """Test running tasks under the lease"""
+
+    def test_only_the_lease_holder_runs_a_task(self, db: Session):
+        runs = []
+        workers = [Scheduler(sessionmaker(bind=db.get_bind()), holder=name) for name in ("worker-a", "worker-b")]
+        for worker in workers:
+            worker.add("count", 30, lambda session, name=worker.holder: runs.append(name))
+
+        for worker in workers:
+            worker.run_pending()
+
+        assert runs == ["worker-a"]
+
+    def test_failures_are_logged_and_do_not_stop_the_scheduler(self, db: Session, caplog: pytest.LogCaptureFixture):
+        scheduler = Scheduler(sessionmaker(bind=db.get_bind()), holder="worker-a")
+
+        def fail(session):
+            raise RuntimeError("boom")
+
+        scheduler.add("fail", 30, fail)
+        assert scheduler.run_pending() > 0
+        assert "Periodic task fail failed" in caplog.text
+
+    def test_start_and_stop(self, db: Session):
+        scheduler = Scheduler(sessionmaker(bind=db.get_bind()), holder="worker-a")
+        scheduler.add("sweep", 30, expire_jobs)
+        scheduler.start()
+        scheduler.stop()
+        assert db.get(SchedulerLease, "sweep").holder == "worker-a"
@@ -0,0 +1,109 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app import feed
+from app.feed import encode_since, parse_since
+from app.models import Job
+from app.pagination import InvalidCursor
+
+
+class TestParseSince:
+    """Test the `since` parameter formats"""
+
+    def test_accepts_iso_timestamp(self):
+        assert parse_since("2026-01-01T00:00:00Z") == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def test_naive_timestamp_is_utc(self):
+        assert parse_since("2026-01-01T00:00:00") == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def test_accepts_cursor(self):
+        since = datetime(2026, 3, 1, 12, 30, tzinfo=timezone.utc)
+        assert parse_since(encode_since(since)) == since
+
+    @pytest.mark.parametrize("value", ["yesterday", "e30"])
+    def test_rejects_garbage(self, value: str):
+        with pytest.raises(InvalidCursor):
+            parse_since(value)
+
+
+class TestStreamingFeed:
+    """Test the full feed streamed from the database"""
+
+    def test_feed_is_one_json_array_newest_first(self, client: TestClient, make_job):
+        now = datetime.now(timezone.utc)
+        make_job(title="Older Role", published_at=now - timedelta(days=1))
+        make_job(title="Newer Role", published_at=now)
+
+        response = client.get("/jobs/feed.json")
+
+        assert response.headers["content-type"] == "application/json"
+        assert [job["title"] for job in response.json()] == ["Newer Role", "Older Role"]
+
+    def test_feed_is_written_in_batches(self, client: TestClient, db, make_job, monkeypatch):
+        """Jobs are serialized batch by batch from the cursor rather than all at once"""
+        monkeypatch.setattr(feed, "FEED_BATCH_SIZE", 2)
+        for i in range(5):
+            make_job(title=f"Role {i}")
+
+        chunks = list(feed.iter_feed(db.get_bind()))
+
+        assert len(chunks) == 5  # "[", three batches, "]"
+        assert len(client.get("/jobs/feed.json").json()) == 5
+
+    def test_empty_feed(self, client: TestClient, db):
+        assert client.get("/jobs/feed.json").json() == []
+
+
+class TestIncrementalFeed:
+    """Test polling the feed with `since`"""
+
+    def test_only_changed_jobs_are_returned(self, client: TestClient, db, make_job):
+        make_job(title="Unchanged Role")
+        db.execute(update(Job).values(updated_at=datetime.now(timezone.utc) - timedelta(days=2)))
+        db.commit()
+        make_job(title="New Role")
+
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        data = client.get("/jobs/feed.json", params={"since": since}).json()
+
+        assert [job["title"] for job in data["jobs"]] == ["New Role"]
+        assert parse_since(data["next_since"]) <= datetime.now(timezone.utc)
+
+    def test_refunded_job_becomes_tombstone(self, client: TestClient, db, published_job: Job):
+        since = datetime.now(timezone.utc) - timedelta(minutes=1)
+        published_job.status = "refunded"
+        db.commit()
+
+        data = client.get("/jobs/feed.json", params={"since": encode_since(since)}).json()
+
+        assert data["jobs"] == [{
+            "id": published_job.id,
+            "deleted": True,
+            "status": "refunded",
+            "updated_at": data["jobs"][0]["updated_at"],
+        }]
+
+    def test_job_expiring_without_edit_becomes_tombstone(self, client: TestClient, db, published_job: Job):
+        """Jobs that time out are reported even though the row was never touched"""
+        long_ago = datetime.now(timezone.utc) - timedelta(days=30)
+        db.execute(
+            update(Job)
+            .where(Job.id == published_job.id)
+            .values(updated_at=long_ago, expires_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+        )
+        db.commit()
+
+        since = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        data = client.get("/jobs/feed.json", params={"since": since}).json()
+
+        assert [(job["id"], job["deleted"], job["status"]) for job in data["jobs"]] == [
+            (published_job.id, True, "expired")
+        ]
+
+    def test_drafts_never_appear(self, client: TestClient, draft_job: Job):
+        since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        assert client.get("/jobs/feed.json", params={"since": since}).json()["jobs"] == []
+
+    def test_invalid_since_is_rejected(self, client: TestClient):
+        assert client.get("/jobs/feed.json", params={"since": "not-a-time"}).status_code == 400
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.expiry import expire_jobs
+from app.listings import format_salary, rebuild_job_listings
+from app.models import Job, JobListing, Employer, Category
+
+
+def listing(db: Session, job_id: int) -> JobListing:
+    db.expire_all()
+    return db.get(JobListing, job_id)
+
+
+class TestFormatting:
+    """Test the display strings stored on listing rows"""
+
+    def test_salary_range(self):
+        assert format_salary(80000, 120000, "USD") == "$80,000 - $120,000 USD"
+
+    def test_salary_needs_both_ends(self):
+        assert format_salary(80000, None, "USD") is None
+        assert format_salary(None, None, None) is None
+
+
+class TestListingRows:
+    """Test that job_listings follows every change to the rows it copies"""
+
+    def test_published_job_is_listed(self, db: Session, published_job: Job, employer: Employer, category: Category):
+        row = listing(db, published_job.id)
+        assert row.title == "Senior Python Developer"
+        assert row.employer_name == employer.name
+        assert (row.category_slug, row.category_name) == (category.slug, category.name)
+        assert row.tag_list == ["python", "django", "fastapi"]
+        assert row.salary == "$80,000 - $120,000 USD"
+        assert row.published_date == published_job.published_at.strftime("%b %d, %Y")
+        assert row.excerpt_html == published_job.excerpt_html
+
+    def test_draft_job_is_not_listed(self, db: Session, draft_job: Job):
+        assert listing(db, draft_job.id) is None
+
+    def test_publishing_lists_the_job(self, db: Session, draft_job: Job):
+        draft_job.status = "published"
+        draft_job.published_at = datetime.now(timezone.utc)
+        draft_job.expires_at = datetime.now(timezone.utc) + timedelta(days=30)
+        db.commit()
+
+        assert listing(db, draft_job.id) is not None
+
+    def test_edits_are_copied(self, db: Session, published_job: Job):
+        published_job.title = "Staff Python Developer"
+        published_job.salary_max = 150000
+        db.commit()
+
+        row = listing(db, published_job.id)
+        assert row.title == "Staff Python Developer"
+        assert row.salary == "$80,000 - $150,000 USD"
+
+    def test_refunded_and_deleted_jobs_are_removed(self, db: Session, published_job: Job):
+        published_job.status = "refunded"
+        db.commit()
+        assert listing(db, published_job.id) is None
+
+        published_job.status = "published"
+        db.commit()
+        db.delete(published_job)
+        db.commit()
+        assert listing(db, published_job.id) is None
+
+    def test_rollback_discards_the_row(self, db: Session, published_job: Job):
+        published_job.title = "Never Saved"
+        db.flush()
+        db.rollback()
+
+        assert listing(db, published_job.id).title == "Senior Python Developer"
+
+    def test_employer_rename(self, db: Session, published_job: Job, employer: Employer):
+        employer.name = "Renamed Company"
+        db.commit()
+
+        assert listing(db, published_job.id).employer_name == "Renamed Company"
+
+    def test_category_rename_and_delete(self, db: Session, published_job: Job, category: Category):
+        category.name = "Engineering"
+        category.slug = "engineering"
+        db.commit()
+        row = listing(db, published_job.id)
+        assert (row.category_slug, row.category_name) == ("engineering", "Engineering")
+
+        published_job.category_id = None
+        db.commit()
+        db.delete(category)
+        db.commit()
+        assert listing(db, published_job.id).category_slug is None
+
+    def test_bulk_updates_are_copied(self, db: Session, published_job: Job):
+        db.execute(update(Job).where(Job.id == published_job.id).values(title="Bulk Edited"))
+        db.commit()
+        assert listing(db, published_job.id).title == "Bulk Edited"
+
+        db.execute(update(Job).where(Job.title == "Bulk Edited").values(status="refunded"))
+        db.commit()
+        assert listing(db, published_job.id) is None
+
+    def test_expiry_sweep_removes_the_row(self, db: Session, published_job: Job):
+        db.execute(update(Job).where(Job.id == published_job.id).values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1)))
+        db.commit()
+
+        expire_jobs(db)
+
+        assert listing(db, published_job.id) is None
+
+    def test_rebuild(self, db: Session, published_job: Job, draft_job: Job):
+        db.connection().execute(delete(JobListing))
+        db.commit()
+
+        assert rebuild_job_listings(db.connection()) == 1
+        db.commit()
+        assert listing(db, published_job.id) is not None
+
+
+class TestListingPages:
+    """Public job cards are rendered from job_listings"""
+
+    def test_cards_show_listing_fields(self, client: TestClient, db: Session, published_job: Job):
+        db.execute(update(JobListing).where(JobListing.id == published_job.id).values(employer_name="From The Read Model"))
+        db.commit()
+
+        response = client.get("/")
+        assert "From The Read Model" in response.text
+        assert "$80,000 - $120,000 USD" in response.text
+
+    def test_search_filters_on_category_slug(self, client: TestClient, published_job: Job, category: Category):
+        assert "Senior Python Developer" in client.get("/search", params={"category": category.slug}).text
+        assert "Senior Python Developer" not in client.get("/search", params={"category": "other"}).text
@@ -0,0 +1,118 @@
+import io
+import json
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from unittest.mock import patch
+from app import logs
+from app.logs import JsonFormatter, RecordQueueHandler, SamplingFilter, configure_logging
+
+
+def make_record(name: str = "app.main", level: int = logging.DEBUG, msg: str = "hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """Test the one-object-per-line output"""
+
+    def test_formats_core_fields(self):
+        entry = json.loads(JsonFormatter().format(make_record()))
+        assert entry["level"] == "DEBUG"
+        assert entry["logger"] == "app.main"
+        assert entry["message"] == "hello world"
+        assert entry["time"].endswith("+00:00")
+
+    def test_includes_extra_fields(self):
+        entry = json.loads(JsonFormatter().format(make_record(job_id=42)))
+        assert entry["job_id"] == 42
+        assert "args" not in entry and "levelno" not in entry
+
+    def test_includes_exception(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exc_info"]
+
+
+class TestSamplingFilter:
+    """Test per-logger sampling"""
+
+    def test_unlisted_loggers_keep_everything(self):
+        sampling = SamplingFilter({"app.auth": 0.0})
+        assert sampling.filter(make_record("app.main"))
+
+    def test_rate_applies_to_child_loggers(self):
+        sampling = SamplingFilter({"app": 0.5, "app.auth": 0.0})
+        assert sampling.rate_for("app.auth.sessions") == 0.0
+        assert sampling.rate_for("app.main") == 0.5
+        assert sampling.rate_for("uvicorn") == 1.0
+
+    def test_drops_sampled_out_records(self):
+        sampling = SamplingFilter({"app.auth": 0.25})
+        with patch("app.logs.random.random", return_value=0.5):
+            assert not sampling.filter(make_record("app.auth"))
+        with patch("app.logs.random.random", return_value=0.1):
+            assert sampling.filter(make_record("app.auth"))
+
+    def test_warnings_are_never_sampled(self):
+        sampling = SamplingFilter({"app.auth": 0.0})
+        assert sampling.filter(make_record("app.auth", level=logging.WARNING))
+        assert not sampling.filter(make_record("app.auth", level=logging.INFO))
+
+
+class TestConfigureLogging:
+    """Test the queue handler and listener wiring"""
+
+    def log_through_queue(self, log) -> dict:
+        """Send records through the same queue wiring as configure_logging and parse the output"""
+        log_queue = queue.SimpleQueue()
+        handler = RecordQueueHandler(log_queue)
+        stream = logging.StreamHandler(io.StringIO())
+        stream.setFormatter(JsonFormatter())
+        listener = QueueListener(log_queue, stream)
+        logger = logging.getLogger("tests.logging.queue")
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        try:
+            listener.start()
+            log(logger)
+            listener.stop()
+        finally:
+            logger.removeHandler(handler)
+        return json.loads(stream.stream.getvalue())
+
+    def test_records_are_written_by_the_listener(self):
+        entry = self.log_through_queue(lambda logger: logger.debug("job %s published", 7, extra={"job_id": 7}))
+        assert entry["message"] == "job 7 published"
+        assert entry["job_id"] == 7
+
+    def test_exceptions_keep_a_structured_exc_info_field(self):
+        def log(logger):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("sweep %s failed", "expire_jobs")
+
+        entry = self.log_through_queue(log)
+
+        assert entry["message"] == "sweep expire_jobs failed"
+        assert "Traceback" in entry["exc_info"]
+        assert "ValueError: boom" in entry["exc_info"]
+
+    def test_installs_one_queue_handler(self):
+        root = logging.getLogger()
+        handlers = [handler for handler in root.handlers if isinstance(handler, QueueHandler)]
+        assert len(handlers) == 1
+        configure_logging()
+        assert [handler for handler in root.handlers if isinstance(handler, QueueHandler)] == handlers
+        assert logs._listener is not None
+
+    def test_debug_tracing_is_off_by_default(self):
+        assert not logging.getLogger("app.main").isEnabledFor(logging.DEBUG)
+        assert not logging.getLogger("app.auth").isEnabledFor(logging.DEBUG)
@@ -1,6 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 from app.models import Job, Employer, Category
+from app.maintenance import backfill_description_html
+from app.utils import markdown_excerpt
 from datetime import datetime, timezone
 
 
@@ -272,4 +275,82 @@ print("Hello World")
         assert "<hr>" in content
         
         # Emphasis
-        assert "<em>End of test</em>" in content 
\ No newline at end of file
+        assert "<em>End of test</em>" in content
+
+
+class TestStoredDescriptionHtml:
+    """Test pre-rendered description and excerpt HTML"""
+    
+    def test_html_is_rendered_on_create(self, db, make_job):
+        job = make_job(description="**Bold** start.\n\n- item")
+        
+        assert "<strong>Bold</strong>" in job.description_html
+        assert "<li>item</li>" in job.excerpt_html
+    
+    def test_html_is_rendered_on_edit(self, db, make_job):
+        job = make_job(description="Original description text.")
+        job.description = "Updated *description* text."
+        db.commit()
+        
+        assert "<em>description</em>" in job.description_html
+        assert "Original" not in job.excerpt_html
+    
+    def test_stored_html_is_sanitized(self, db, make_job):
+        job = make_job(description="Hello <script>alert('xss')</script> world")
+        
+        assert "<script>" not in job.description_html
+        assert "&lt;script&gt;" in job.description_html
+    
+    def test_pages_use_stored_html(self, client: TestClient, db, make_job):
+        """Templates read the stored HTML instead of rendering the Markdown again"""
+        job = make_job(description="Plain description for the page.")
+        db.execute(update(Job).where(Job.id == job.id).values(
+            description_html="<p>stored-detail-html</p>",
+            excerpt_html="<p>stored-excerpt-html</p>"
+        ))
+        db.commit()
+        
+        assert "stored-excerpt-html" in client.get("/").text
+        assert "stored-detail-html" in client.get(f"/jobs/{job.id}").text
+    
+    def test_rows_without_stored_html_render_live(self, client: TestClient, db, make_job):
+        job = make_job(description="Needs **live** rendering.")
+        db.execute(update(Job).where(Job.id == job.id).values(description_html=None, excerpt_html=None))
+        db.commit()
+        
+        assert "<strong>live</strong>" in client.get("/").text
+        assert "<strong>live</strong>" in client.get(f"/jobs/{job.id}").text
+    
+    def test_backfill_renders_missing_rows(self, db, make_job):
+        jobs = [make_job(description=f"Description number **{i}**.") for i in range(3)]
+        db.execute(update(Job).values(description_html=None, excerpt_html=None))
+        db.commit()
+        
+        rendered = backfill_description_html(db, batch_size=2)
+        
+        assert rendered == 3
+        for i, job in enumerate(jobs):
+            db.refresh(job)
+            assert f"<strong>{i}</strong>" in job.description_html
+        assert backfill_description_html(db) == 0
+
+
+class TestMarkdownExcerpt:
+    """Test the card excerpt taken from a description"""
+    
+    def test_short_description_is_kept_whole(self):
+        text = "Intro paragraph.\n\n- one\n- two"
+        assert markdown_excerpt(text) == text
+    
+    def test_long_description_is_cut_at_block_boundary(self):
+        text = "First paragraph.\n\n" + "x" * 400 + "\n\nLast paragraph."
+        assert markdown_excerpt(text) == "First paragraph."
+    
+    def test_first_block_is_always_kept(self):
+        text = "y" * 500
+        assert markdown_excerpt(text) == text
+    
+    def test_blank_lines_inside_code_fence_do_not_split(self):
+        text = "Intro.\n\n```\ncode line\n\nmore code\n```"
+        assert markdown_excerpt(text, max_chars=1000) == text
+
@@ -0,0 +1,138 @@
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.config import settings
+from app.metrics import UNMATCHED_ROUTE, RequestStats, _request_stats, server_timing
+from app import renderer
+from app.models import Job
+from app.utils import render_markdown
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestRequestMetrics:
+    """Test the per-route request metrics"""
+
+    def test_labels_requests_by_route_template(self, client: TestClient, published_job: Job):
+        labels = {"method": "GET", "route": "/jobs/{job_id}", "status": "200"}
+        before = sample("http_requests_total", **labels)
+        client.get(f"/jobs/{published_job.id}")
+        assert sample("http_requests_total", **labels) == before + 1
+
+    def test_records_latency_histogram(self, client: TestClient):
+        before = sample("http_request_duration_seconds_count", method="GET", route="/")
+        client.get("/")
+        assert sample("http_request_duration_seconds_count", method="GET", route="/") == before + 1
+
+    def test_cache_hits_keep_the_route_template(self, client: TestClient, published_job: Job):
+        client.get(f"/jobs/{published_job.id}")
+        labels = {"method": "GET", "route": "/jobs/{job_id}", "status": "200"}
+        before = sample("http_requests_total", **labels)
+        response = client.get(f"/jobs/{published_job.id}")
+        assert response.headers["x-cache"] == "HIT"
+        assert sample("http_requests_total", **labels) == before + 1
+
+    def test_unmatched_paths_share_one_label(self, client: TestClient):
+        labels = {"method": "GET", "route": UNMATCHED_ROUTE, "status": "404"}
+        before = sample("http_requests_total", **labels)
+        client.get("/no-such-page/123")
+        client.get("/no-such-page/456")
+        assert sample("http_requests_total", **labels) == before + 2
+
+    def test_counts_database_queries_per_request(self, client: TestClient, published_job: Job):
+        before_count = sample("db_queries_per_request_count", route="/")
+        before_sum = sample("db_queries_per_request_sum", route="/")
+        client.get("/")
+        assert sample("db_queries_per_request_count", route="/") == before_count + 1
+        assert sample("db_queries_per_request_sum", route="/") > before_sum
+
+    def test_records_template_render_time(self, client: TestClient):
+        before = sample("template_render_seconds_count", template="index.html")
+        client.get("/")
+        assert sample("template_render_seconds_count", template="index.html") == before + 1
+
+
+class TestMarkdownMetrics:
+    """Test Markdown render timing"""
+
+    def test_adds_render_time_to_current_request(self):
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        try:
+            before = sample("markdown_render_seconds_count")
+            render_markdown("**metrics**")
+        finally:
+            _request_stats.reset(token)
+        assert sample("markdown_render_seconds_count") == before + 1
+        assert stats.markdown_seconds > 0
+
+
+class TestMetricsEndpoint:
+    """Test access to /metrics"""
+
+    def test_anonymous_is_rejected(self, client: TestClient):
+        response = client.get("/metrics")
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+
+    def test_admin_can_view(self, client: TestClient, admin_session: dict):
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
+        assert "password_hash_queue_depth " in response.text
+
+    def test_scraper_token(self, client: TestClient, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+        assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    def test_token_is_unset_by_default(self, client: TestClient):
+        assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+class TestServerTiming:
+    """Test the Server-Timing header"""
+
+    def test_sent_to_admins_by_default(self, client: TestClient, admin_session: dict):
+        response = client.get("/admin")
+        names = [part.split(";")[0] for part in response.headers["server-timing"].split(", ")]
+        assert names == ["db", "markdown", "template", "auth", "app", "total"]
+        assert 'desc="Database (' in response.headers["server-timing"]
+
+    def test_not_sent_to_anonymous_visitors_by_default(self, client: TestClient):
+        assert "server-timing" not in client.get("/").headers
+
+    def test_all_mode(self, client: TestClient, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "server_timing", "all")
+        assert "template;dur=" in client.get("/").headers["server-timing"]
+
+    def test_off_mode(self, client: TestClient, admin_session: dict, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(settings, "server_timing", "off")
+        assert "server-timing" not in client.get("/admin").headers
+
+    def test_breakdown(self):
+        stats = RequestStats(db_queries=3, db_seconds=0.010, template_seconds=0.020, markdown_seconds=0.005, auth_seconds=0.001)
+        header = server_timing(stats, 0.050)
+        assert 'db;dur=10.0;desc="Database (3 queries)"' in header
+        assert "markdown;dur=5.0" in header
+        assert "app;dur=19.0" in header
+        assert header.endswith('total;dur=50.0;desc="Total"')
+
+
+class TestRenderCacheMetrics:
+    """Test the Markdown render cache counters"""
+
+    def test_counts_hits_and_misses(self):
+        renderer.cache.clear()
+        hits = sample("markdown_cache_hits_total")
+        misses = sample("markdown_cache_misses_total")
+
+        render_markdown("**metrics render cache**")
+        render_markdown("**metrics render cache**")
+
+        assert sample("markdown_cache_hits_total") == hits + 1
+        assert sample("markdown_cache_misses_total") == misses + 1
+        assert sample("markdown_cache_entries") == renderer.cache_info().currsize
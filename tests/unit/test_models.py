@@ -27,6 +27,11 @@ class TestJobProperties:
         job = Job(tags=" python , django , fastapi ")
         assert job.tag_list == ["python", "django", "fastapi"]
     
+    def test_tag_list_skips_empty_entries(self):
+        """Test tag_list property ignores empty entries from stray commas"""
+        job = Job(tags="python,, django,")
+        assert job.tag_list == ["python", "django"]
+    
     def test_is_expired_future_date(self):
         """Test is_expired with future expiry date"""
         future_date = datetime.now(timezone.utc) + timedelta(days=1)
@@ -0,0 +1,121 @@
+import pytest
+import re
+from fastapi.testclient import TestClient
+from app.models import Job
+from app.config import settings
+from app.pagination import encode_cursor, decode_cursor, InvalidCursor
+from datetime import datetime, timezone, timedelta
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    """Use a tiny page size so a handful of jobs spans several pages"""
+    monkeypatch.setattr(settings, "jobs_page_size", 2)
+
+
+def add_jobs(make_job, count: int, published_at=None) -> list[Job]:
+    """Create `count` published jobs, one minute apart unless published_at is given"""
+    now = datetime.now(timezone.utc)
+    return [
+        make_job(
+            title=f"Position {i:02d}",
+            description="A job description long enough to be valid.",
+            tags="python",
+            published_at=published_at or now - timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def titles(html: str) -> list[str]:
+    return re.findall(r"Position \d{2}", html)
+
+
+def sentinel_url(html: str):
+    match = re.search(r'hx-get="([^"]+)"\s+hx-trigger="revealed"', html)
+    return match.group(1).replace("&amp;", "&") if match else None
+
+
+def scroll_all(client: TestClient, first_html: str) -> list[str]:
+    """Follow load-more sentinels until the last page, collecting job titles"""
+    seen = titles(first_html)
+    url = sentinel_url(first_html)
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen += titles(response.text)
+        url = sentinel_url(response.text)
+    return seen
+
+
+class TestCursorEncoding:
+    """Test opaque cursor round-tripping"""
+
+    def test_round_trip(self):
+        position = {"published_at": "2025-01-01T00:00:00", "id": 7}
+        assert decode_cursor(encode_cursor(position)) == position
+
+    def test_garbage_cursor_is_rejected(self):
+        with pytest.raises(InvalidCursor):
+            decode_cursor("not-a-cursor!!")
+
+
+class TestKeysetPagination:
+    """Test infinite scroll on the home page and search results"""
+
+    def test_home_page_renders_first_page_with_sentinel(self, client: TestClient, make_job, small_pages):
+        add_jobs(make_job, 5)
+
+        response = client.get("/")
+
+        assert titles(response.text) == ["Position 00", "Position 01"]
+        assert sentinel_url(response.text).startswith("/search?cursor=")
+
+    def test_scrolling_returns_every_job_once(self, client: TestClient, make_job, small_pages):
+        add_jobs(make_job, 5)
+
+        seen = scroll_all(client, client.get("/").text)
+
+        assert seen == [f"Position {i:02d}" for i in range(5)]
+
+    def test_jobs_with_identical_publish_time_are_not_skipped(self, client: TestClient, make_job, small_pages):
+        """The id tie-break keeps pages stable when published_at collides"""
+        add_jobs(make_job, 5, published_at=datetime.now(timezone.utc))
+
+        seen = scroll_all(client, client.get("/").text)
+
+        assert sorted(seen) == [f"Position {i:02d}" for i in range(5)]
+
+    def test_last_page_has_no_sentinel(self, client: TestClient, make_job, small_pages):
+        add_jobs(make_job, 2)
+
+        assert sentinel_url(client.get("/").text) is None
+
+    def test_load_more_returns_cards_only(self, client: TestClient, make_job, small_pages):
+        add_jobs(make_job, 3)
+        url = sentinel_url(client.get("/").text)
+
+        response = client.get(url)
+
+        assert titles(response.text) == ["Position 02"]
+        assert "Found" not in response.text
+
+    def test_sentinel_keeps_search_filters(self, client: TestClient, make_job, category, small_pages):
+        add_jobs(make_job, 3)
+
+        response = client.get("/search", params={"tags": "python", "category": category.slug})
+
+        url = sentinel_url(response.text)
+        assert "tags=python" in url
+        assert f"category={category.slug}" in url
+
+    def test_ranked_search_pages_through_all_matches(self, client: TestClient, make_job, small_pages):
+        add_jobs(make_job, 5)
+
+        seen = scroll_all(client, client.get("/search", params={"q": "position"}).text)
+
+        assert sorted(seen) == [f"Position {i:02d}" for i in range(5)]
+
+    def test_invalid_cursor_returns_400(self, client: TestClient):
+        response = client.get("/search", params={"cursor": "bogus"})
+        assert response.status_code == 400
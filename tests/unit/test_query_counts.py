@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import cache as response_cache
+from app.models import Employer, Category, EmployerAccount
+
+
+# Upper bound on SQL statements for any listing route, independent of job count
+MAX_LISTING_QUERIES = 8
+
+
+def add_jobs(make_job, employer_account: EmployerAccount, start: int, count: int) -> None:
+    """Create `count` published jobs, each with its own employer and category"""
+    for i in range(start, start + count):
+        make_job(
+            title=f"Engineer {i}",
+            description="A job description long enough to be valid.",
+            tags="python,remote",
+            employer=Employer(name=f"Employer {i}", account_id=employer_account.id),
+            category=Category(name=f"Category {i}", slug=f"category-{i}"),
+            employer_account_id=employer_account.id,
+        )
+
+
+LISTING_ROUTES = [
+    ("/", None),
+    ("/search?q=engineer", None),
+    ("/search?tags=python", None),
+    ("/jobs/feed.json", None),
+    ("/sitemap.xml", None),
+    ("/admin", "admin_session"),
+    ("/employer/dashboard", "employer_session"),
+]
+
+
+class TestListingQueryCounts:
+    """Listing routes must not issue a query per job (N+1)"""
+
+    @pytest.mark.parametrize("path,session_fixture", LISTING_ROUTES)
+    def test_query_count_is_bounded(self, request, client: TestClient, make_job, employer_account: EmployerAccount, query_counter, path, session_fixture):
+        if session_fixture:
+            client.cookies.update(request.getfixturevalue(session_fixture))
+
+        add_jobs(make_job, employer_account, 0, 2)
+        # Warm per-process lookups (e.g. the FTS check) so both counts are steady state
+        client.get(path)
+        response_cache.clear()
+        with query_counter:
+            assert client.get(path).status_code == 200
+        few_jobs_count = query_counter.count
+
+        add_jobs(make_job, employer_account, 2, 20)
+        with query_counter:
+            response = client.get(path)
+        many_jobs_count = query_counter.count
+
+        assert response.status_code == 200
+        assert "Employer 21" in response.text or path == "/sitemap.xml"
+        assert many_jobs_count == few_jobs_count
+        assert many_jobs_count <= MAX_LISTING_QUERIES
@@ -0,0 +1,102 @@
+import re
+import pytest
+from contextlib import contextmanager
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.models import Job, Employer, Category
+from app.pagination import encode_cursor
+from app.conditional import active_jobs_validators
+
+
+@contextmanager
+def capture_job_selects(engine, table: str = "jobs"):
+    """Record every SELECT against `table` issued on `engine`"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(rf"FROM {table}\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(engine, statement, parameters) -> str:
+    """Run EXPLAIN QUERY PLAN for a captured statement and join the plan details"""
+    raw = engine.raw_connection()
+    try:
+        rows = raw.cursor().execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    finally:
+        raw.close()
+    return "\n".join(row[-1] for row in rows)
+
+
+class TestActiveJobsQueryPlan:
+    """The hot "active published jobs" listing must be served from an index"""
+
+    def test_feed_uses_index(self, client: TestClient, db, published_job: Job):
+        engine = db.get_bind()
+
+        with capture_job_selects(engine) as statements:
+            assert client.get("/jobs/feed.json").status_code == 200
+
+        listings = [captured for captured in statements if "ORDER BY" in captured[0]]
+        assert listings, "the feed issued no job listing query"
+        plan = query_plan(engine, *listings[0])
+        assert "USING INDEX ix_jobs_status_published_at_expires_at" in plan or "USING INDEX ix_jobs_published_active" in plan
+        assert "SCAN jobs" not in plan.splitlines()
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+    @pytest.mark.parametrize("path, params, index", [
+        ("/", None, "ix_job_listings_published_at_id"),
+        ("/search", None, "ix_job_listings_published_at_id"),
+        ("/search", {"category": "engineering"}, "ix_job_listings_category_slug_published_at_id"),
+    ])
+    def test_cards_read_job_listings_in_index_order(self, client: TestClient, db, published_job: Job, path: str, params, index: str):
+        """Job cards come from the job_listings read model alone, already in index order"""
+        engine = db.get_bind()
+
+        with capture_job_selects(engine) as job_statements, capture_job_selects(engine, "job_listings") as statements:
+            assert client.get(path, params=params).status_code == 200
+
+        assert not [captured for captured in job_statements if "ORDER BY" in captured[0]]
+        statements = [captured for captured in statements if "ORDER BY" in captured[0]]
+        assert statements, f"{path} issued no job_listings query"
+        assert "JOIN" not in statements[0][0]
+        plan = query_plan(engine, *statements[0])
+        assert f"USING INDEX {index}" in plan
+        assert "TEMP B-TREE" not in plan
+
+    def test_conditional_get_validators_use_index(self, db, published_job: Job):
+        """The validators are read on every poll, so each must be an index seek"""
+        engine = db.get_bind()
+
+        with capture_job_selects(engine) as statements:
+            active_jobs_validators(db, "feed")
+
+        plan = query_plan(engine, *statements[0])
+        assert "SCAN jobs" not in plan.splitlines()
+        assert "SCAN job_listings" not in plan.splitlines()
+        assert "SEARCH jobs USING COVERING INDEX ix_jobs_updated_at" in plan
+        assert "SEARCH job_listings USING COVERING INDEX ix_job_listings_updated_at" in plan
+        assert "SEARCH jobs USING COVERING INDEX ix_jobs_status_published_at_expires_at (status=? AND published_at<?)" in plan
+
+    def test_active_jobs_indexes_exist(self):
+        index_names = {index.name for index in Job.__table__.indexes}
+        assert "ix_jobs_status_published_at_expires_at" in index_names
+        assert "ix_jobs_published_active" in index_names
+
+    def test_next_page_seeks_into_index(self, client: TestClient, db, published_job: Job):
+        """Keyset pages after the first must seek on published_at, not scan from the top"""
+        engine = db.get_bind()
+        cursor = encode_cursor({"published_at": published_job.published_at.isoformat(), "id": published_job.id})
+
+        with capture_job_selects(engine, "job_listings") as statements:
+            assert client.get("/search", params={"cursor": cursor}).status_code == 200
+
+        plan = query_plan(engine, *statements[0])
+        assert "SEARCH job_listings USING INDEX ix_job_listings_published_at_id (published_at<?)" in plan
+
@@ -0,0 +1,135 @@
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app import query_stats as query_stats_module
+from app import renderer
+from app.config import settings
+from app.models import Job
+from app.query_stats import MAX_FINGERPRINTS, OTHER_FINGERPRINT, QueryStats, explain, fingerprint, query_stats
+from app.utils import render_markdown
+
+
+@pytest.fixture(autouse=True)
+def clear_query_stats():
+    query_stats.clear()
+    yield
+    query_stats.clear()
+
+
+class TestFingerprint:
+    """Test statement normalization"""
+
+    def test_replaces_literals_and_placeholders(self):
+        assert fingerprint("SELECT * FROM jobs WHERE id = 42 AND title = 'x''y'") == \
+            "SELECT * FROM jobs WHERE id = ? AND title = ?"
+        assert fingerprint("SELECT * FROM jobs WHERE id = %(id_1)s") == "SELECT * FROM jobs WHERE id = ?"
+        assert fingerprint("SELECT * FROM jobs WHERE id = :id") == "SELECT * FROM jobs WHERE id = ?"
+
+    def test_keeps_identifiers_with_digits(self):
+        assert fingerprint("SELECT anon_1.id FROM t AS anon_1 LIMIT 10") == "SELECT anon_1.id FROM t AS anon_1 LIMIT ?"
+
+    def test_collapses_in_lists_and_whitespace(self):
+        assert fingerprint("SELECT *\n  FROM jobs\n WHERE id IN (?, ?, ?)") == "SELECT * FROM jobs WHERE id IN (...)"
+        assert fingerprint("SELECT * FROM jobs WHERE id IN (?)") == fingerprint("SELECT * FROM jobs WHERE id IN (?, ?)")
+
+    def test_keeps_postgres_casts(self):
+        assert fingerprint("SELECT x::integer FROM t") == "SELECT x::integer FROM t"
+
+
+class TestQueryStats:
+    """Test the per-fingerprint aggregates"""
+
+    def test_groups_by_fingerprint(self):
+        stats = QueryStats()
+        stats.record("SELECT * FROM jobs WHERE id = 1", 0.002)
+        stats.record("SELECT * FROM jobs WHERE id = 2", 0.004)
+        [entry] = stats.top(10)
+        assert entry.count == 2
+        assert entry.total_seconds == pytest.approx(0.006)
+        assert entry.max_seconds == 0.004
+        assert entry.mean_seconds == pytest.approx(0.003)
+
+    def test_p95(self):
+        stats = QueryStats()
+        for millis in range(1, 101):
+            stats.record("SELECT 1", millis / 1000)
+        assert stats.top(1)[0].p95_seconds == pytest.approx(0.096)
+
+    def test_top_sorts_and_limits(self):
+        stats = QueryStats()
+        stats.record("SELECT * FROM jobs", 0.5)
+        for _ in range(3):
+            stats.record("SELECT * FROM categories", 0.01)
+        assert [entry.fingerprint for entry in stats.top(1)] == ["SELECT * FROM jobs"]
+        assert [entry.fingerprint for entry in stats.top(1, "count")] == ["SELECT * FROM categories"]
+
+    def test_pools_fingerprints_beyond_the_limit(self, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(query_stats_module, "MAX_FINGERPRINTS", 1)
+        stats = QueryStats()
+        stats.record("SELECT * FROM jobs", 0.001)
+        stats.record("SELECT * FROM categories", 0.001)
+        assert {entry.fingerprint for entry in stats.top(10)} == {"SELECT * FROM jobs", OTHER_FINGERPRINT}
+
+
+class TestInstrumentation:
+    """Test the engine event hooks"""
+
+    def test_records_executed_statements(self, db: Session, published_job: Job):
+        db.query(Job).filter(Job.id == published_job.id).all()
+        fingerprints = [entry.fingerprint for entry in query_stats.top(MAX_FINGERPRINTS)]
+        assert any(fp.startswith("SELECT jobs.id") and "WHERE jobs.id = ?" in fp for fp in fingerprints)
+
+    def test_logs_slow_queries_with_plan(self, db: Session, published_job: Job, monkeypatch: pytest.MonkeyPatch,
+                                         caplog: pytest.LogCaptureFixture):
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 0.000001)
+        with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+            db.execute(text("SELECT id FROM jobs WHERE id = :id"), {"id": published_job.id}).all()
+        record = next(r for r in caplog.records if r.fingerprint == "SELECT id FROM jobs WHERE id = ?")
+        assert record.getMessage().startswith("Slow query")
+        assert "jobs" in record.plan
+        [entry] = [e for e in query_stats.top(MAX_FINGERPRINTS) if e.fingerprint == record.fingerprint]
+        assert entry.slow_count == 1
+
+    def test_threshold_zero_disables_slow_log(self, db: Session, monkeypatch: pytest.MonkeyPatch,
+                                              caplog: pytest.LogCaptureFixture):
+        monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+        with caplog.at_level(logging.WARNING, logger="app.query_stats"):
+            db.execute(text("SELECT 1")).all()
+        assert not caplog.records
+
+    def test_explain_skips_writes(self, db: Session):
+        cursor = db.connection().connection.cursor()
+        assert explain(cursor, "DELETE FROM jobs", (), "sqlite") is None
+
+
+class TestDiagnosticsPage:
+    """Test the admin diagnostics page"""
+
+    def test_requires_admin(self, client: TestClient):
+        response = client.get("/admin/diagnostics")
+        assert response.status_code == 302
+        assert response.headers["location"] == "/admin/login"
+
+    def test_lists_top_fingerprints(self, client: TestClient, admin_session: dict):
+        query_stats.record("SELECT * FROM jobs WHERE id = 7", 0.25)
+        response = client.get("/admin/diagnostics?sort=p95_seconds")
+        assert response.status_code == 200
+        assert "SELECT * FROM jobs WHERE id = ?" in response.text
+        assert "250.0 ms" in response.text
+
+    def test_unknown_sort_falls_back_to_total(self, client: TestClient, admin_session: dict):
+        response = client.get("/admin/diagnostics?sort=__class__")
+        assert response.status_code == 200
+        assert "by total time" in response.text
+
+    def test_shows_render_cache_counters(self, client: TestClient, admin_session: dict):
+        renderer.cache.clear()
+        render_markdown("**cached**")
+        render_markdown("**cached**")
+
+        response = client.get("/admin/diagnostics")
+
+        assert "Markdown Render Cache" in response.text
+        assert "50.0%" in response.text
@@ -0,0 +1,74 @@
+import pytest
+import threading
+from app import renderer
+from app.renderer import RenderCache
+from app.utils import render_markdown
+
+
+@pytest.fixture(autouse=True)
+def clear_render_cache():
+    """Start each test with an empty cache and zeroed counters"""
+    renderer.cache.clear()
+    yield
+    renderer.cache.clear()
+
+
+class TestRenderCache:
+    """Test the LRU cache in front of the Markdown renderer"""
+
+    def test_repeat_render_is_a_hit(self):
+        first = render_markdown("**cached**")
+        second = render_markdown("**cached**")
+
+        assert first == second == "<p><strong>cached</strong></p>"
+        info = renderer.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_safe_flag_is_part_of_the_key(self):
+        assert "&lt;b&gt;" in render_markdown("<b>x</b>", safe=True)
+        assert "<b>x</b>" in render_markdown("<b>x</b>", safe=False)
+        assert renderer.cache_info().misses == 2
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = RenderCache(maxsize=2)
+        keys = [cache.key(text, True) for text in ("a", "b", "c")]
+        cache.put(keys[0], "A")
+        cache.put(keys[1], "B")
+        cache.get(keys[0])
+        cache.put(keys[2], "C")
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == "A"
+        assert cache.info().currsize == 2
+
+    def test_zero_size_disables_caching(self):
+        cache = RenderCache(maxsize=0)
+        cache.put(cache.key("a", True), "A")
+        assert cache.info().currsize == 0
+
+    def test_empty_text_renders_empty(self):
+        assert render_markdown("") == ""
+        assert renderer.cache_info().misses == 0
+
+
+class TestParserReuse:
+    """Test per-thread Markdown instances"""
+
+    def test_parser_is_reused_within_a_thread(self):
+        render_markdown("one")
+        parser = renderer._parser()
+        render_markdown("two")
+        assert renderer._parser() is parser
+
+    def test_state_does_not_leak_between_documents(self):
+        """reset() clears reference definitions collected from the previous document"""
+        render_markdown("[docs]: https://example.com/docs\n\nSee [docs][docs].")
+        html = render_markdown("See [docs][docs] again.")
+        assert "href" not in html
+
+    def test_each_thread_gets_its_own_parser(self):
+        parsers = []
+        thread = threading.Thread(target=lambda: parsers.append(renderer._parser()))
+        thread.start()
+        thread.join()
+        assert parsers[0] is not renderer._parser()
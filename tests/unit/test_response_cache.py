@@ -0,0 +1,230 @@
+import os
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app import cache as response_cache
+from app.cache import DiskCacheBackend, MemoryCacheBackend, CachedResponse
+from app.config import settings
+from app.models import Job
+
+
+class TestResponseCacheMiddleware:
+    """Test full-page caching of anonymous public pages"""
+
+    @pytest.mark.parametrize("path", ["/", "/jobs/feed.json", "/sitemap.xml"])
+    def test_second_request_is_a_hit(self, client: TestClient, published_job: Job, path: str):
+        first = client.get(path)
+        second = client.get(path)
+
+        assert first.headers["x-cache"] == "MISS"
+        assert second.headers["x-cache"] == "HIT"
+        assert second.content == first.content
+
+    def test_hit_does_not_touch_the_database(self, client: TestClient, published_job: Job, query_counter):
+        client.get(f"/jobs/{published_job.id}")
+
+        with query_counter:
+            response = client.get(f"/jobs/{published_job.id}")
+
+        assert response.headers["x-cache"] == "HIT"
+        assert query_counter.count == 0
+
+    def test_job_edit_invalidates_cached_pages(self, client: TestClient, db, published_job: Job):
+        client.get("/")
+        published_job.title = "Renamed Staff Engineer"
+        db.commit()
+
+        response = client.get("/")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert "Renamed Staff Engineer" in response.text
+
+    def test_bulk_update_invalidates_cached_pages(self, client: TestClient, db, published_job: Job):
+        client.get("/")
+        db.execute(update(Job).where(Job.id == published_job.id).values(status="expired"))
+        db.commit()
+
+        response = client.get("/")
+
+        assert response.headers["x-cache"] == "MISS"
+        assert published_job.title not in response.text
+
+    def test_rolled_back_changes_do_not_invalidate(self, client: TestClient, db, published_job: Job):
+        client.get("/")
+        published_job.title = "Never Saved"
+        db.flush()
+        db.rollback()
+
+        assert client.get("/").headers["x-cache"] == "HIT"
+
+    def test_ignored_query_params_share_one_entry(self, client: TestClient, published_job: Job):
+        client.get("/")
+        assert client.get("/?utm_source=newsletter").headers["x-cache"] == "HIT"
+        assert client.get(f"/jobs/{published_job.id}?ref=1").headers["x-cache"] == "MISS"
+
+        response = client.get(f"/jobs/{published_job.id}?ref=2")
+
+        assert response.headers["x-cache"] == "HIT"
+        assert "?ref=" not in response.text
+
+    def test_host_header_does_not_split_the_cache(self, client: TestClient, published_job: Job):
+        """Clients choose the Host header, so it must not mint new entries"""
+        client.get(f"/jobs/{published_job.id}")
+
+        response = client.get(f"/jobs/{published_job.id}", headers={"host": "attacker.example"})
+
+        assert response.headers["x-cache"] == "HIT"
+        assert "attacker.example" not in response.text
+        assert f'{settings.site_url.rstrip("/")}/jobs/{published_job.id}' in response.text
+
+    def test_authenticated_requests_bypass_cache(self, client: TestClient, employer_session: dict, published_job: Job):
+        client.cookies.update(employer_session)
+
+        client.get("/")
+        response = client.get("/")
+
+        assert "x-cache" not in response.headers
+        assert "Dashboard" in response.text
+
+    def test_error_responses_are_not_cached(self, client: TestClient):
+        client.get("/jobs/99999")
+        assert client.get("/jobs/99999").headers["x-cache"] == "MISS"
+
+    def test_entries_expire_after_ttl(self, client: TestClient, published_job: Job, monkeypatch):
+        monkeypatch.setattr(settings, "response_cache_ttl", -1)
+        client.get("/")
+        assert client.get("/").headers["x-cache"] == "MISS"
+
+    def test_other_routes_are_not_cached(self, client: TestClient, published_job: Job):
+        assert "x-cache" not in client.get("/search").headers
+
+    def test_feed_changes_are_not_cached(self, client: TestClient, published_job: Job):
+        """Every ?since= value is a different client's cursor, so none is stored"""
+        response = client.get("/jobs/feed.json", params={"since": "2024-01-01T00:00:00Z"})
+
+        assert response.status_code == 200
+        assert "x-cache" not in response.headers
+
+    def test_large_responses_stream_through_uncached(self, client: TestClient, published_job: Job, monkeypatch):
+        monkeypatch.setattr(settings, "response_cache_max_body_bytes", 64)
+
+        first = client.get("/jobs/feed.json")
+        second = client.get("/jobs/feed.json")
+
+        assert first.headers["x-cache"] == second.headers["x-cache"] == "MISS"
+        assert second.content == first.content
+        assert published_job.title in second.text
+
+
+class TestCacheBackends:
+    """Test the pluggable storage backends"""
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_bytes=20)
+        for key in ("a", "b", "c"):
+            backend.set(key, CachedResponse(200, [], key.encode() * 10))
+
+        assert backend.get("a") is None
+        assert backend.get("b").body == b"b" * 10
+        assert backend.get("c").body == b"c" * 10
+        assert backend.size == 20
+
+    def test_memory_backend_skips_entries_over_the_limit(self):
+        backend = MemoryCacheBackend(max_bytes=20)
+        backend.set("small", CachedResponse(200, [], b"x"))
+        backend.set("large", CachedResponse(200, [(b"content-type", b"text/html")], b"x" * 10))
+
+        assert backend.get("large") is None
+        assert backend.get("small") is not None
+        assert backend.size == 1
+
+    def test_memory_backend_replacing_an_entry_frees_its_bytes(self):
+        backend = MemoryCacheBackend(max_bytes=20)
+        backend.set("key", CachedResponse(200, [], b"x" * 15))
+        backend.set("key", CachedResponse(200, [], b"y" * 15))
+        backend.delete("missing")
+
+        assert backend.size == 15
+        assert backend.get("key").body == b"y" * 15
+
+    def test_memory_backend_ttl_leaves_room_for_the_expiry_sweep(self, monkeypatch):
+        """Other workers never see the sweep's commit, so their entries must age out in time"""
+        monkeypatch.setattr(response_cache, "backend", MemoryCacheBackend(max_bytes=1024))
+        monkeypatch.setattr(settings, "response_cache_ttl", 60)
+        monkeypatch.setattr(settings, "expiry_sweep_interval_seconds", 30)
+        monkeypatch.setattr(settings, "expired_job_max_listed_seconds", 60)
+
+        assert response_cache.entry_ttl() == 30
+
+        monkeypatch.setattr(settings, "expiry_sweep_interval_seconds", 90)
+        assert response_cache.entry_ttl() == 0
+
+    def test_disk_backend_ttl_is_not_capped(self, tmp_path, monkeypatch):
+        """The disk backend's version is shared, so the sweep invalidates every worker"""
+        monkeypatch.setattr(response_cache, "backend", DiskCacheBackend(str(tmp_path), max_bytes=1024))
+        monkeypatch.setattr(settings, "response_cache_ttl", 60)
+
+        assert response_cache.entry_ttl() == 60
+
+    def test_disk_backend_round_trip(self, tmp_path):
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+        backend.set("key", CachedResponse(200, [(b"content-type", b"text/html")], b"<p>hi</p>"))
+
+        entry = backend.get("key")
+
+        assert entry.body == b"<p>hi</p>"
+        assert entry.headers == [(b"content-type", b"text/html")]
+
+    def test_disk_backend_version_is_shared_between_workers(self, tmp_path):
+        """A bump from one worker invalidates entries seen by another"""
+        worker_a = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+        worker_b = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+        worker_a.set("key", CachedResponse(200, [], b"old"))
+
+        worker_b.bump_version()
+
+        assert worker_a.version() == worker_b.version() == 1
+        assert worker_a.get("key") is None
+
+    def test_disk_backend_keeps_the_retired_version_for_slow_writers(self, tmp_path):
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+        backend.set("key", CachedResponse(200, [], b"old"))
+
+        backend.bump_version()
+        assert (tmp_path / "v0").exists()
+
+        backend.bump_version()
+        assert not (tmp_path / "v0").exists()
+
+    def test_disk_backend_io_errors_are_misses(self, tmp_path, monkeypatch):
+        """A version bump can remove the directory while another worker writes into it"""
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+
+        def removed(*args, **kwargs):
+            raise FileNotFoundError
+
+        monkeypatch.setattr("app.cache.tempfile.mkstemp", removed)
+        backend.set("key", CachedResponse(200, [], b"body"))
+
+        assert backend.get("key") is None
+
+    def test_disk_backend_evicts_oldest_files_over_the_limit(self, tmp_path):
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=1024)
+        for key in ("a", "b", "c"):
+            if key == "c":
+                # Room for two entries only
+                backend.max_bytes = 2 * (tmp_path / "v0" / "a").stat().st_size + 10
+            backend.set(key, CachedResponse(200, [], key.encode() * 30, stored_at=1.0))
+            mtime = time.time() - 10 + ord(key)
+            os.utime(tmp_path / "v0" / key, (mtime, mtime))
+
+        assert backend.get("a") is None
+        assert backend.get("b").body == b"b" * 30
+        assert backend.get("c").body == b"c" * 30
+
+    def test_disk_backend_skips_entries_over_the_limit(self, tmp_path):
+        backend = DiskCacheBackend(str(tmp_path), max_bytes=100)
+        backend.set("large", CachedResponse(200, [], b"x" * 100))
+
+        assert backend.get("large") is None
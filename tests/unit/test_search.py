@@ -0,0 +1,137 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.models import Tag
+from app.search import build_match_query, clear_fts_cache, fts_available
+from datetime import datetime, timezone, timedelta
+
+
+class TestBuildMatchQuery:
+    """Test conversion of user input into FTS5 MATCH expressions"""
+
+    def test_single_word_becomes_prefix_term(self):
+        assert build_match_query("python") == '"python"*'
+
+    def test_multiple_words_are_combined(self):
+        assert build_match_query("senior python") == '"senior"* "python"*'
+
+    def test_fts_operators_are_neutralised(self):
+        """Quotes, parentheses and column filters must not reach FTS5 as syntax"""
+        assert build_match_query('title:"x" OR (y') == '"title"* "x"* "OR"* "y"*'
+
+    def test_input_without_words_returns_none(self):
+        assert build_match_query("  ,;!  ") is None
+        assert build_match_query("") is None
+
+
+class TestFullTextSearch:
+    """Test /search against the FTS5 index"""
+
+    def test_fts_index_is_created_with_jobs_table(self, db):
+        assert fts_available(db)
+
+    def test_search_matches_description(self, client: TestClient, make_job):
+        """Description text is searchable through the index"""
+        make_job(title="Backend Engineer", description="You will maintain our Kubernetes clusters.")
+
+        response = client.get("/search", params={"q": "kubernetes"})
+
+        assert response.status_code == 200
+        assert "Backend Engineer" in response.text
+
+    def test_search_matches_word_prefix(self, client: TestClient, make_job):
+        """Partially typed words match while the user is typing"""
+        make_job(title="Senior Flutter Developer", tags="flutter,mobile,dart")
+
+        response = client.get("/search", params={"q": "flut"})
+
+        assert "Senior Flutter Developer" in response.text
+
+    def test_search_results_ranked_by_relevance(self, client: TestClient, make_job):
+        """A title match outranks a newer job that only mentions the term in its description"""
+        now = datetime.now(timezone.utc)
+        make_job(title="Rust Engineer", published_at=now - timedelta(days=3))
+        make_job(title="Go Engineer", description="Some rust exposure is a plus.", published_at=now)
+
+        response = client.get("/search", params={"q": "rust"})
+
+        assert response.text.index("Rust Engineer") < response.text.index("Go Engineer")
+
+    def test_index_follows_updates(self, client: TestClient, db, make_job):
+        """Triggers keep the index in sync when a job is edited"""
+        job = make_job(title="Elixir Developer")
+        job.title = "Haskell Developer"
+        db.commit()
+
+        assert "Haskell Developer" in client.get("/search", params={"q": "haskell"}).text
+        assert "Developer" not in client.get("/search", params={"q": "elixir"}).text
+
+    def test_index_follows_deletes(self, db, make_job):
+        """Triggers remove deleted jobs from the index"""
+        job = make_job(title="Scala Developer")
+        db.delete(job)
+        db.commit()
+
+        count = db.execute(text("SELECT count(*) FROM jobs_fts WHERE jobs_fts MATCH 'scala'")).scalar()
+        assert count == 0
+
+    def test_fts_check_runs_once(self, client: TestClient, published_job, query_counter):
+        """HTMX searches on every keystroke, so sqlite_master is read only once"""
+        client.get("/search", params={"q": "pyth"})
+
+        with query_counter:
+            client.get("/search", params={"q": "python"})
+
+        assert not [statement for statement in query_counter.statements if "sqlite_master" in statement]
+
+    def test_search_falls_back_to_like_without_fts(self, client: TestClient, db, make_job):
+        """Databases without the FTS index keep using LIKE matching"""
+        make_job(title="Senior Python Developer", tags="python,django")
+        db.execute(text("DROP TABLE jobs_fts"))
+        db.commit()
+        clear_fts_cache()
+
+        assert not fts_available(db)
+        response = client.get("/search", params={"q": "ython"})
+
+        assert response.status_code == 200
+        assert "Senior Python Developer" in response.text
+
+
+class TestTagFilter:
+    """Test exact, normalized tag filtering in /search"""
+
+    def test_tags_are_normalized_on_save(self, db, make_job):
+        """Tag strings are split into shared, slugged Tag rows"""
+        first = make_job(tags="Python, Machine Learning")
+        second = make_job(tags="python,C++")
+
+        assert {tag.slug for tag in first.normalized_tags} == {"python", "machine-learning"}
+        assert {tag.slug for tag in second.normalized_tags} == {"python", "c++"}
+        assert db.query(Tag).filter(Tag.slug == "python").count() == 1
+
+    def test_normalized_tags_follow_edits(self, db, make_job):
+        job = make_job(tags="python,django")
+        job.tags = "python,fastapi"
+        db.commit()
+
+        assert {tag.slug for tag in job.normalized_tags} == {"python", "fastapi"}
+
+    def test_tag_filter_is_exact(self, client: TestClient, make_job):
+        """Filtering on "java" no longer matches "javascript" jobs"""
+        make_job(title="Java Backend Role", tags="java,spring")
+        make_job(title="Frontend Role", tags="javascript,react")
+
+        response = client.get("/search", params={"tags": "Java"})
+
+        assert "Java Backend Role" in response.text
+        assert "Frontend Role" not in response.text
+
+    def test_tag_filter_requires_all_tags(self, client: TestClient, make_job):
+        make_job(title="Full Stack Role", tags="python,react")
+        make_job(title="Backend Role", tags="python,django")
+
+        response = client.get("/search", params={"tags": "python, react"})
+
+        assert "Full Stack Role" in response.text
+        assert "Backend Role" not in response.text
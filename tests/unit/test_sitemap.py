@@ -0,0 +1,111 @@
+import gzip
+import pytest
+from datetime import datetime, timezone, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from app import sitemap
+from app.config import settings
+from app.models import Job
+
+
+def shard_urls(response) -> str:
+    return gzip.decompress(response.content).decode()
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    """Two job ids per shard so a handful of jobs spans several shards"""
+    monkeypatch.setattr(settings, "sitemap_shard_size", 2)
+
+
+class TestSitemapIndex:
+    """Test /sitemap.xml as an index of shards"""
+
+    def test_index_lists_pages_and_shards(self, client: TestClient, make_job, small_shards):
+        for _ in range(5):
+            make_job()
+
+        text = client.get("/sitemap.xml").text
+
+        assert "<sitemapindex" in text
+        assert "/sitemaps/pages.xml</loc>" in text
+        for number in (1, 2, 3):
+            assert f"/sitemaps/jobs-{number}.xml.gz</loc>" in text
+        assert "/sitemaps/jobs-4.xml.gz" not in text
+
+    def test_shards_without_active_jobs_are_omitted(self, client: TestClient, make_job, small_shards):
+        make_job()
+        make_job()
+        make_job(expires_at=datetime.now(timezone.utc) - timedelta(days=1))
+
+        text = client.get("/sitemap.xml").text
+
+        assert "/sitemaps/jobs-1.xml.gz" in text
+        assert "/sitemaps/jobs-2.xml.gz" not in text
+
+    def test_pages_sitemap_lists_home_page(self, client: TestClient):
+        response = client.get("/sitemaps/pages.xml")
+
+        assert response.status_code == 200
+        assert f"<loc>{settings.site_url}/</loc>" in response.text
+
+
+class TestSitemapShards:
+    """Test the gzipped job shards"""
+
+    def test_shard_holds_only_its_id_range(self, client: TestClient, make_job, small_shards):
+        jobs = [make_job() for _ in range(4)]
+
+        response = client.get("/sitemaps/jobs-2.xml.gz")
+
+        assert response.headers["content-type"] == "application/gzip"
+        urls = shard_urls(response)
+        assert urls.startswith('<?xml version="1.0"')
+        assert [f"/jobs/{job.id}</loc>" in urls for job in jobs] == [False, False, True, True]
+
+    def test_expired_and_draft_jobs_are_excluded(self, client: TestClient, make_job, published_job: Job, draft_job: Job):
+        expired = make_job(expires_at=datetime.now(timezone.utc) - timedelta(days=1))
+
+        urls = shard_urls(client.get("/sitemaps/jobs-1.xml.gz"))
+
+        assert f"/jobs/{published_job.id}</loc>" in urls
+        assert f"/jobs/{draft_job.id}</loc>" not in urls
+        assert f"/jobs/{expired.id}</loc>" not in urls
+
+    def test_shard_is_streamed_in_batches(self, db, make_job, monkeypatch):
+        monkeypatch.setattr(sitemap, "SHARD_BATCH_SIZE", 2)
+        for _ in range(5):
+            make_job()
+        stamp = sitemap.shard_stamp(db, 1)
+
+        chunks = list(sitemap.iter_shard(db.get_bind(), 1, stamp))
+
+        assert len(chunks) == 5  # header, three batches, footer
+        assert gzip.decompress(b"".join(chunks)).decode().count("<url>") == 5
+
+    @pytest.mark.parametrize("path", ["/sitemaps/jobs-9.xml.gz", "/sitemaps/jobs-0.xml.gz"])
+    def test_empty_or_invalid_shard_is_404(self, client: TestClient, published_job: Job, path: str):
+        assert client.get(path).status_code == 404
+
+    def test_shard_is_cached_until_its_range_changes(self, client: TestClient, db, make_job, small_shards, monkeypatch):
+        jobs = [make_job() for _ in range(3)]
+        client.get("/sitemaps/jobs-1.xml.gz")
+        client.get("/sitemaps/jobs-2.xml.gz")
+
+        rendered = []
+        real_iter_shard = sitemap.iter_shard
+        monkeypatch.setattr("app.main.iter_shard", lambda engine, number, stamp: rendered.append(number) or real_iter_shard(engine, number, stamp))
+
+        jobs[2].title = "Edited Role"
+        db.commit()
+        client.get("/sitemaps/jobs-1.xml.gz")
+        client.get("/sitemaps/jobs-2.xml.gz")
+
+        assert rendered == [2]
+
+    def test_shard_supports_conditional_get(self, client: TestClient, published_job: Job):
+        etag = client.get("/sitemaps/jobs-1.xml.gz").headers["etag"]
+
+        response = client.get("/sitemaps/jobs-1.xml.gz", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304